@@ -1,13 +1,38 @@
 import os
 import ssl
+from types import MappingProxyType
+from typing import Optional, Mapping
+
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _load_twitter_cookies(raw: str) -> Optional[Mapping[str, str]]:
+    """
+    Parses TWITTER_COOKIES_JSON once at import into a read-only mapping.
+    Returns None when the variable is unset or is not a JSON object.
+    """
+    if not raw:
+        return None
+    try:
+        cookies = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
+    return MappingProxyType(cookies) if isinstance(cookies, dict) else None
+
 class Config:
     x_api_key = os.getenv("X_API_KEY", "")
     x_api_key_2 = os.getenv("X_API_KEY_2", "")
     twitter_cookies_json = os.getenv("TWITTER_COOKIES_JSON", "")
+    twitter_cookies = _load_twitter_cookies(twitter_cookies_json)
+    # Credentials used only when no cookies are configured
+    twitter_email = os.getenv("TWITTER_EMAIL", "")
+    twitter_username = os.getenv("TWITTER_USERNAME", "")
+    twitter_password = os.getenv("TWITTER_PASSWORD", "")
+    linkedin_cookies_li_at = os.getenv("LINKEDIN_COOKIES_LI_AT", "")
+    linkedin_max_workers = max(1, int(os.getenv("LINKEDIN_MAX_WORKERS", "3")))
+    linkedin_max_scrapers = max(1, int(os.getenv("LINKEDIN_MAX_SCRAPERS", "2")))
     enable_debug = (os.getenv("ENABLE_DEBUG", "false").lower() == "true")
     venice_api_key = os.getenv("VENICE_API_KEY", "")
     venice_model = os.getenv("VENICE_MODEL", "")
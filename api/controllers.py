@@ -4,9 +4,11 @@ from dotenv import load_dotenv
 import unicodedata
 load_dotenv()
 
+import orjson
 from fastapi import Request, HTTPException
+from fastapi.responses import StreamingResponse
 from typing import List, Tuple
-from .services import google_service, twitter_service, web_service
+from .services import google_service, twitter_service, web_service, get_linkedin_service
 from .utils import logger
 from .types import SearchMode
 from .config import config
@@ -312,3 +314,63 @@ async def scrape_urls_controller(urls: List[str], query: str):
                      exc_info=True,
                      extra={"error": str(e)})
         raise HTTPException(status_code=500, detail="Failed to scrape provided URLs.")
+
+#
+# LINKEDIN controller
+#
+def _validate_candidate_search(search_params: dict):
+    if not search_params.get("job_title"):
+        raise HTTPException(status_code=400, detail="Missing job_title.")
+    if search_params.get("limit", 10) < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1.")
+
+async def find_candidates_controller(search_params: dict):
+    logger.info("Controller: find_candidates_controller called", extra={"params": search_params})
+    _validate_candidate_search(search_params)
+    try:
+        result = await get_linkedin_service().find_candidates(search_params)
+        if config.enable_debug:
+            logger.debug("DEBUG OUTPUT find_candidates_controller", extra={"total_found": result.get("total_found")})
+        return result
+    except Exception as e:
+        logger.error("Error in find_candidates_controller",
+                     exc_info=True,
+                     extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail="Failed to search LinkedIn candidates.")
+
+async def find_candidates_batch_controller(params_list: list):
+    logger.info("Controller: find_candidates_batch_controller called", extra={"count": len(params_list)})
+    if not params_list:
+        raise HTTPException(status_code=400, detail="No searches given.")
+    if len(params_list) > 10:
+        raise HTTPException(status_code=400, detail="At most 10 searches per batch.")
+    for search_params in params_list:
+        _validate_candidate_search(search_params)
+    try:
+        return await get_linkedin_service().find_candidates_batch(params_list)
+    except Exception as e:
+        logger.error("Error in find_candidates_batch_controller",
+                     exc_info=True,
+                     extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail="Failed to search LinkedIn candidates.")
+
+async def find_candidates_stream_controller(search_params: dict):
+    """
+    Streams candidates as newline-delimited JSON: one line per candidate as soon as it is
+    scored, then a final line with the search metadata (or the error).
+    """
+    logger.info("Controller: find_candidates_stream_controller called", extra={"params": search_params})
+    _validate_candidate_search(search_params)
+    try:
+        candidates = await get_linkedin_service().find_candidates_stream(search_params)
+    except Exception as e:
+        logger.error("Error in find_candidates_stream_controller",
+                     exc_info=True,
+                     extra={"error": str(e)})
+        raise HTTPException(status_code=500, detail="Failed to search LinkedIn candidates.")
+
+    async def ndjson():
+        async for item in candidates:
+            yield orjson.dumps(item) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
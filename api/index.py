@@ -1,14 +1,18 @@
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 
-from .routes import twitter_router, google_router, web_router, email_router
+from .routes import twitter_router, google_router, web_router, email_router, linkedin_router
+from .services.http_client import close_http_client
+from .services.rate_limiter import close_redis
 from .utils import logger
 
 logger.info("Starting the application entry point...")
 
-app = FastAPI()
+# Responses are serialized with orjson instead of the stdlib json encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 
 class LogBodyMiddleware(BaseHTTPMiddleware):
     """
@@ -46,6 +50,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors()}
     )
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Releases process-wide network resources (shared HTTP and Redis connection pools).
+    """
+    await close_http_client()
+    await close_redis()
+
 # Attach the middleware
 app.add_middleware(LogBodyMiddleware)
 
@@ -54,3 +66,4 @@ app.include_router(twitter_router, prefix="/twitter", tags=["twitter"])
 app.include_router(google_router, prefix="/google", tags=["google"])
 app.include_router(web_router, prefix="/web", tags=["web"])
 app.include_router(email_router, prefix="/email", tags=["email"])
+app.include_router(linkedin_router, prefix="/linkedin", tags=["linkedin"])
@@ -16,17 +16,21 @@ from .controllers import (
     quote_tweet,
     retweet,
     like_tweet,
-    scrape_urls_controller
+    scrape_urls_controller,
+    find_candidates_controller,
+    find_candidates_batch_controller,
+    find_candidates_stream_controller
 )
 from typing import Optional
 from .services import email_service
-from .types import EmailPayload
+from .types import EmailPayload, CandidateSearchPayload
 from .utils import logger
 
 google_router = APIRouter()
 twitter_router = APIRouter()
 web_router = APIRouter()
 email_router = APIRouter()
+linkedin_router = APIRouter()
 
 # ------------------ GOOGLE ROUTES ------------------
 @google_router.get("/search")
@@ -157,6 +161,30 @@ async def scrape_urls_route(
     logger.debug(f"Raw request body (decoded): {raw_body.decode('utf-8', errors='replace')}")
     return await scrape_urls_controller(body.urls, body.query)
 
+# ------------------ LINKEDIN ROUTES ------------------
+@linkedin_router.post("/find-candidates")
+async def find_candidates_route(body: CandidateSearchPayload, _=Depends(require_api_key)):
+    logger.debug("Route POST /linkedin/find-candidates called.")
+    return await find_candidates_controller(body.dict(exclude_none=True))
+
+@linkedin_router.post("/find-candidates/stream")
+async def find_candidates_stream_route(body: CandidateSearchPayload, _=Depends(require_api_key)):
+    """
+    POST /linkedin/find-candidates/stream => same search as /linkedin/find-candidates,
+    returned as NDJSON while the scrape is still running.
+    """
+    logger.debug("Route POST /linkedin/find-candidates/stream called.")
+    return await find_candidates_stream_controller(body.dict(exclude_none=True))
+
+@linkedin_router.post("/find-candidates/batch")
+async def find_candidates_batch_route(body: List[CandidateSearchPayload], _=Depends(require_api_key)):
+    """
+    POST /linkedin/find-candidates/batch => several /linkedin/find-candidates searches
+    run by one scraper; returns their results in request order.
+    """
+    logger.debug("Route POST /linkedin/find-candidates/batch called.")
+    return await find_candidates_batch_controller([search.dict(exclude_none=True) for search in body])
+
 # ------------------ EMAIL ROUTE ------------------
 @email_router.post("/send")
 async def send_email(payload: EmailPayload, _=Depends(require_api_key)):
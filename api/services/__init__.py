@@ -1,6 +1,7 @@
 from .google_service import google_service
 from .twitter_service import twitter_service
 from .web_service import web_service, email_service
+from .linkedin_service import get_linkedin_service
 from .rate_limiter import RateLimiter
 
 __all__ = [
@@ -8,5 +9,6 @@ __all__ = [
     'twitter_service',
     'web_service',
     'email_service',
+    'get_linkedin_service',
     'RateLimiter'
 ]
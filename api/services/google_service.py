@@ -1,21 +1,39 @@
 import os
 import time
+import random
+import hashlib
 import traceback
 import asyncio
-from typing import List, Tuple, Optional
-from urllib.parse import urlparse
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Tuple, Optional, FrozenSet
+from urllib.parse import urlparse, unquote
 
-from fastapi.concurrency import run_in_threadpool
-from googlesearch import search
-from requests.exceptions import HTTPError
+import orjson
+from selectolax.lexbor import LexborHTMLParser
 
 from ..config import config
 from ..utils import logger
 from .rate_limiter import RateLimiter
+from .http_client import get_http_client
 
 # Global variable for the in-memory approach
 _last_google_call = 0
 
+# Google search request parameters. Google serves its basic-HTML results page (result
+# blocks in div.ezO2md) to text browsers, so requests identify as Lynx, and the
+# CONSENT/SOCS cookies skip the consent interstitial.
+_GOOGLE_SEARCH_URL = "https://www.google.com/search"
+_GOOGLE_COOKIES = {"CONSENT": "PENDING+987", "SOCS": "CAESHAgBEhIaAB"}
+_GOOGLE_TIMEOUT = 5.0
+
+# Raw (unfiltered) result lists are cached per query/timeframe/size for this many seconds.
+_SEARCH_CACHE_TTL = 300
+
+def _search_cache_key(query: str, tf: Optional[str], max_results: int) -> str:
+    digest = hashlib.blake2s(f"{query}|{tf}|{max_results}".encode("utf-8"), digest_size=16).hexdigest()
+    return f"gsearch:{digest}"
+
 # List of common user-agent strings for Google search requests.
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
@@ -23,30 +41,135 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
 ]
 
-def is_blacklisted(url: str, blacklisted_domains: List[str]) -> bool:
+def _lynx_user_agent() -> str:
+    """
+    Returns a randomized Lynx user-agent string.
+    """
+    return (
+        f"Lynx/{random.randint(2, 3)}.{random.randint(8, 9)}.{random.randint(0, 2)} "
+        f"libwww-FM/{random.randint(2, 3)}.{random.randint(13, 15)} "
+        f"SSL-MM/{random.randint(1, 2)}.{random.randint(3, 5)} "
+        f"OpenSSL/{random.randint(1, 3)}.{random.randint(0, 4)}.{random.randint(0, 9)}"
+    )
+
+def _parse_result_links(html: str) -> List[str]:
+    """
+    Extracts the result URLs from a basic-HTML Google results page. As in googlesearch,
+    only blocks with a title and a description are results; the others link back into
+    Google (related searches and the like).
+    """
+    links = []
+    for block in LexborHTMLParser(html).css("div.ezO2md"):
+        link_tag = block.css_first("a[href]")
+        if link_tag is None or link_tag.css_first("span.CVA68e") is None or block.css_first("span.FrIlee") is None:
+            continue
+        href = link_tag.attributes.get("href") or ""
+        link = unquote(href.split("&")[0].replace("/url?q=", ""))
+        if link.startswith(("http://", "https://")):
+            links.append(link)
+    return links
+
+async def _google_search(query: str, num_results: int, sleep_interval: float, lang: str = "en") -> List[str]:
+    """
+    Native async Google search over the shared httpx client.
+    Pages through results 10 at a time until `num_results` links are collected or a page
+    yields nothing, sleeping `sleep_interval` seconds between pages without holding a thread.
+    Raises httpx.HTTPStatusError on non-2xx responses (e.g. 429).
+    """
+    client = get_http_client()
+    results: List[str] = []
+    start = 0
+    while len(results) < num_results:
+        response = await client.get(
+            _GOOGLE_SEARCH_URL,
+            params={
+                "q": query,
+                "num": num_results - start + 2,
+                "hl": lang,
+                "start": start,
+                "safe": "active"
+            },
+            headers={"User-Agent": _lynx_user_agent(), "Accept": "*/*"},
+            cookies=_GOOGLE_COOKIES,
+            timeout=_GOOGLE_TIMEOUT
+        )
+        response.raise_for_status()
+        page_links = _parse_result_links(response.text)
+        if not page_links:
+            break
+        results.extend(page_links[:num_results - len(results)])
+        if len(results) >= num_results:
+            break
+        start += 10
+        await asyncio.sleep(sleep_interval)
+    return results
+
+# Distributed queue slot: returns how long to wait, or reserves the next slot and returns 0.
+_SLOT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local min_interval = tonumber(ARGV[2])
+local key = KEYS[1]
+local next_allowed = tonumber(redis.call("get", key) or "0")
+if now < next_allowed then
+    return next_allowed - now
+else
+    local new_next = now + min_interval
+    redis.call("set", key, new_next)
+    return 0
+end
+"""
+
+# Supported timeframe values -> how many days back the "after:" filter reaches.
+_TIMEFRAME_DAYS = {"24h": 1, "week": 7, "month": 30, "year": 365}
+
+def build_query(q: str, tf: Optional[str]) -> str:
+    """
+    Appends an "after:YYYY-MM-DD" filter for the given timeframe to the query.
+    Unknown timeframes are logged and ignored.
+    """
+    if tf is None:
+        return q
+    days = _TIMEFRAME_DAYS.get(tf.lower())
+    if days is None:
+        logger.warning("Invalid timeframe provided, ignoring timeframe filter", extra={"timeframe": tf})
+        return q
+    return f"{q} after:{(datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')}"
+
+@lru_cache(maxsize=8)
+def _load_blacklist(raw: str) -> FrozenSet[str]:
+    """
+    Parses SEARCH_BLACKLISTED_DOMAINS into a lowercased frozenset, once per distinct value.
     """
-    Checks if the URL's domain is in the list of blacklisted domains.
+    return frozenset(d.strip().lower() for d in raw.split(",") if d.strip())
+
+@lru_cache(maxsize=4096)
+def is_blacklisted(url: str, blacklisted_domains: FrozenSet[str]) -> bool:
+    """
+    Checks if the URL's domain is in the set of blacklisted domains.
     It returns True if the domain matches exactly or is a subdomain of any blacklisted domain.
+    Each label suffix of the host is looked up in the set, so the cost depends on the
+    number of labels rather than the size of the blacklist. Results are memoized, since
+    the week -> year -> none fallback re-checks largely the same URLs.
     """
-    try:
-        domain = urlparse(url).netloc.lower()
-        for b in blacklisted_domains:
-            b = b.lower()
-            if domain == b or domain.endswith("." + b):
-                return True
+    if not blacklisted_domains:
         return False
+    try:
+        parts = urlparse(url).netloc.lower().split(".")
+        return any(".".join(parts[i:]) in blacklisted_domains for i in range(len(parts)))
     except Exception:
         return False
 
 class GoogleService:
     """
-    Service layer for performing Google searches using the googlesearch library.
+    Service layer for performing Google searches with a native async scraper over the shared httpx client.
     Includes a rate limiter to prevent excessive calls and a distributed queue mechanism
     to uniformly space out requests over time.
     """
     def __init__(self):
         # Lower rate limit to reduce chance of being blacklisted
-        self.rate_limiter_google = RateLimiter(5, 60_000)
+        self.rate_limiter_google = RateLimiter(5, 60_000, name="google")
+        # Registered on first use; calls go out as EVALSHA instead of resending the script body.
+        self._slot_script = None
 
     async def _acquire_google_search_slot(self):
         """
@@ -60,21 +183,11 @@ class GoogleService:
         if self.rate_limiter_google.redis_client:
             client = self.rate_limiter_google.redis_client
             now = time.time()
-            script = """
-            local now = tonumber(ARGV[1])
-            local min_interval = tonumber(ARGV[2])
-            local key = KEYS[1]
-            local next_allowed = tonumber(redis.call("get", key) or "0")
-            if now < next_allowed then
-                return next_allowed - now
-            else
-                local new_next = now + min_interval
-                redis.call("set", key, new_next)
-                return 0
-            end
-            """
+            if self._slot_script is None:
+                self._slot_script = client.register_script(_SLOT_SCRIPT)
             try:
-                wait_time = await client.eval(script, 1, key, now, min_interval)
+                # EVALSHA, transparently re-loading the script on NOSCRIPT.
+                wait_time = await self._slot_script(keys=[key], args=[now, min_interval], client=client)
                 wait_time = float(wait_time)
                 if wait_time > 0:
                     logger.debug("Distributed queue: waiting for %.2f seconds", wait_time)
@@ -96,21 +209,14 @@ class GoogleService:
         _last_google_call = time.time()
 
     async def _search_with_retries(self, query: str, max_results: int) -> List[str]:
+        import httpx
         max_attempts = 3
         delay = 1
         for attempt in range(max_attempts):
             try:
-                return await run_in_threadpool(
-                    lambda: list(
-                        search(
-                            query,
-                            num_results=max_results,
-                            sleep_interval=2.5
-                        )
-                    )
-                )
-            except HTTPError as http_err:
-                if http_err.response is not None and http_err.response.status_code == 429:
+                return await _google_search(query, max_results, sleep_interval=2.5)
+            except httpx.HTTPStatusError as http_err:
+                if http_err.response.status_code == 429:
                     logger.warning("HTTP 429 received from Google search. Attempt %d/%d", attempt + 1, max_attempts)
                     if attempt < max_attempts - 1:
                         await asyncio.sleep(delay)
@@ -122,42 +228,72 @@ class GoogleService:
                 else:
                     raise
 
+    async def _cache_get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """
+        Reads cached raw result lists for several search variants in one MGET.
+        Returns None per key on a miss or when Redis is unavailable.
+        """
+        if not self.rate_limiter_google.redis_client:
+            return [None] * len(keys)
+        try:
+            return await self.rate_limiter_google.safe_execute('mget', keys)
+        except Exception as e:
+            if config.enable_debug:
+                logger.exception("Redis error in Google search caching get")
+            else:
+                logger.error("Redis error in Google search caching get", extra={"error": str(e)})
+            return [None] * len(keys)
+
+    async def _cache_set(self, key: str, results: List[str]):
+        if not results or not self.rate_limiter_google.redis_client:
+            return
+        try:
+            await self.rate_limiter_google.safe_execute('set', key, orjson.dumps(results), ex=_SEARCH_CACHE_TTL)
+        except Exception as e:
+            if config.enable_debug:
+                logger.exception("Redis error in Google search caching set")
+            else:
+                logger.error("Redis error in Google search caching set", extra={"error": str(e)})
+
     async def google_search(self, query: str, max_results: int, timeframe: str = None) -> Tuple[List[str], str]:
         logger.debug("GoogleService: google_search called", extra={"query": query, "max_results": max_results, "timeframe": timeframe})
-        await self.rate_limiter_google.check()
-        await self._acquire_google_search_slot()
 
         # Get the list of blacklisted domains from environment variable
-        blacklist_env = os.getenv("SEARCH_BLACKLISTED_DOMAINS", "")
-        blacklisted_domains = [d.strip().lower() for d in blacklist_env.split(",") if d.strip()]
-
-        # Local helper to build query with timeframe
-        def build_query(q: str, tf: Optional[str]) -> str:
-            from datetime import datetime, timedelta
-            if tf is None:
-                return q
-            if tf.lower() == "24h":
-                date = datetime.now() - timedelta(days=1)
-            elif tf.lower() == "week":
-                date = datetime.now() - timedelta(days=7)
-            elif tf.lower() == "month":
-                date = datetime.now() - timedelta(days=30)
-            elif tf.lower() == "year":
-                date = datetime.now() - timedelta(days=365)
-            else:
-                logger.warning("Invalid timeframe provided, ignoring timeframe filter", extra={"timeframe": tf})
-                return q
-            return f"{q} after:{date.strftime('%Y-%m-%d')}"
+        blacklisted_domains = _load_blacklist(os.getenv("SEARCH_BLACKLISTED_DOMAINS", ""))
 
-        if timeframe and timeframe.lower() == "week":
-            # Updated fallback sequence: "week" -> "year" -> None
-            fallback_timeframes = ["week", "year", None]
+        is_week = bool(timeframe) and timeframe.lower() == "week"
+        # Updated fallback sequence: "week" -> "year" -> None
+        variants = ["week", "year", None] if is_week else [timeframe or None]
+        # Look up every variant up front, so e.g. a cached "year" result skips a live "week" search.
+        cache_keys = [_search_cache_key(query, tf, max_results) for tf in variants]
+        cached = await self._cache_get_many(cache_keys)
+        slot_acquired = False
+
+        async def acquire_slot(i: int):
+            # Rate limiting and spacing only apply to searches that actually reach Google
+            nonlocal slot_acquired
+            if cached[i] is None and not slot_acquired:
+                await self.rate_limiter_google.check()
+                await self._acquire_google_search_slot()
+                slot_acquired = True
+
+        async def run_variant(i: int) -> List[str]:
+            if cached[i] is not None:
+                logger.debug("Returning cached Google search results", extra={"query": query, "timeframe": variants[i]})
+                return orjson.loads(cached[i])
+            tf = variants[i]
+            mod_query = build_query(query, tf) if tf is not None else query
+            results = await self._search_with_retries(mod_query, max_results)
+            await self._cache_set(cache_keys[i], results)
+            return results
+
+        if is_week:
             results = []
             effective_tf = "none"
-            for tf in fallback_timeframes:
-                mod_query = build_query(query, tf) if tf is not None else query
+            for i, tf in enumerate(variants):
+                await acquire_slot(i)
                 try:
-                    results = await self._search_with_retries(mod_query, max_results)
+                    results = await run_variant(i)
                 except Exception:
                     results = []
                 # Filter out invalid URLs, PDFs, and blacklisted domains
@@ -184,14 +320,10 @@ class GoogleService:
             return filtered_results, effective_tf
         else:
             # Handle non-"week" timeframes or no timeframe without fallback
-            if timeframe:
-                mod_query = build_query(query, timeframe)
-                effective_tf = timeframe.lower()
-            else:
-                mod_query = query
-                effective_tf = "none"
+            effective_tf = timeframe.lower() if timeframe else "none"
+            await acquire_slot(0)
             try:
-                results = await self._search_with_retries(mod_query, max_results)
+                results = await run_variant(0)
             except Exception as e:
                 tb = traceback.format_exc()
                 logger.error("Error in google_search method", extra={"error": str(e), "traceback": tb})
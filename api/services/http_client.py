@@ -0,0 +1,39 @@
+from typing import Optional, TYPE_CHECKING
+
+from ..utils import logger
+
+if TYPE_CHECKING:
+    import httpx
+
+# Process-wide async HTTP client, created on first use so that importing the
+# services does not pay for httpx/h2 at cold start.
+_client: Optional["httpx.AsyncClient"] = None
+
+def get_http_client() -> "httpx.AsyncClient":
+    """
+    Returns the shared httpx.AsyncClient (HTTP/2 + keep-alive pool).
+    Reusing one client lets outbound requests share TCP/TLS connections
+    instead of paying a new handshake on every call.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        import httpx
+        _client = httpx.AsyncClient(
+            http2=True,
+            # Idle connections are kept for a minute (httpx default: 5s), long enough to
+            # survive the gaps between a client's successive searches
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60),
+            timeout=10.0
+        )
+        logger.debug("Shared httpx.AsyncClient created.")
+    return _client
+
+async def close_http_client():
+    """
+    Closes the shared client. Called from the FastAPI shutdown hook.
+    """
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.debug("Shared httpx.AsyncClient closed.")
+    _client = None
@@ -1,11 +1,27 @@
 """Service for finding job candidates on LinkedIn."""
 import logging
 import asyncio
-import json
+import copy
+import hashlib
+import heapq
 import re
 import os
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, FrozenSet, Set, Callable, AsyncIterator
+import orjson
+from cachetools import TTLCache
 from fastapi.concurrency import run_in_threadpool
+
+from ..config import config
+
+# linkedin-jobs-scraper reads LI_AT_COOKIE once, when it is first imported, so the cookie
+# is exported here (once per process) rather than when a scraper is created
+if config.linkedin_cookies_li_at:
+    os.environ["LI_AT_COOKIE"] = config.linkedin_cookies_li_at
+
 from linkedin_jobs_scraper import LinkedinScraper
 from linkedin_jobs_scraper.events import Events, EventData, EventMetrics
 from linkedin_jobs_scraper.query import Query, QueryOptions, QueryFilters
@@ -14,10 +30,357 @@ from linkedin_jobs_scraper.filters import (
     OnSiteOrRemoteFilters, IndustryFilters, SalaryBaseFilters
 )
 
-from ..config import config
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; skills are then matched one by one with str.find
+    ahocorasick = None
+
 from ..utils import logger
 from .rate_limiter import RateLimiter
 
+# Candidate search results are cached in-process for this many seconds.
+_SEARCH_CACHE_TTL = 600
+
+# find_candidates searches arriving within this many seconds of each other share a
+# scraper run, up to _BATCH_MAX_SEARCHES of them. Every search waits out the window,
+# so a search that arrives alone starts this much later than it otherwise would.
+_BATCH_WINDOW = 0.05
+_BATCH_MAX_SEARCHES = 10
+
+def _search_cache_key(search_params: Dict[str, Any]) -> str:
+    """Hash of the search parameters that determine the result, in a canonical form."""
+    skills = [s.lower() for s in search_params.get("skills") or []]
+    params = {
+        # Stripped the same way as in _build_queries and _build_scoring_context
+        "job_title": (search_params.get("job_title") or "").strip().lower(),
+        # The first three skills go into the LinkedIn query text in the caller's order;
+        # scoring only looks at the whole set
+        "query_skills": skills[:3],
+        "skills": sorted(skills),
+        "location": search_params.get("location") or {},
+        "experience_years_min": search_params.get("experience_years_min"),
+        "industry": (search_params.get("industry") or "").strip().lower(),
+        "limit": min(search_params.get("limit", 10), 100),
+        "excluded_companies": sorted(c.lower() for c in search_params.get("excluded_companies") or []),
+    }
+    return hashlib.blake2s(orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+# Common tech skills to look for, in the order they are reported
+TECH_SKILLS = (
+    "python", "java", "javascript", "c++", "ruby", "php", "scala", "go", "rust",
+    "react", "angular", "vue", "node.js", "django", "flask", "spring", "rails",
+    "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ci/cd",
+    "machine learning", "artificial intelligence", "data science", "big data",
+    "sql", "nosql", "mongodb", "postgresql", "mysql", "oracle", "sql server",
+    "agile", "scrum", "kanban", "devops", "sre", "tdd", "bdd"
+)
+
+def _build_skills_automaton():
+    """Aho-Corasick automaton over the skill names, matched against lowercased text."""
+    automaton = ahocorasick.Automaton()
+    for skill in TECH_SKILLS:
+        automaton.add_word(skill, skill)
+    automaton.make_automaton()
+    return automaton
+
+SKILLS_AC = _build_skills_automaton() if ahocorasick is not None else None
+
+def _is_word_char(c: str) -> bool:
+    """Word characters (letters, digits, underscore), which may not border a skill name."""
+    return c.isalnum() or c == "_"
+
+# Industry keywords mapped to LinkedIn industry filters, checked in this order
+_INDUSTRY_MAP = {
+    "technology": (IndustryFilters.TECHNOLOGY_INTERNET, IndustryFilters.IT_SERVICES, IndustryFilters.SOFTWARE_DEVELOPMENT),
+    "finance": (IndustryFilters.FINANCIAL_SERVICES, IndustryFilters.BANKING, IndustryFilters.INVESTMENT_BANKING, IndustryFilters.INVESTMENT_MANAGEMENT),
+    "aviation": (IndustryFilters.AIRLINES_AVIATION,),
+    "engineering": (IndustryFilters.CIVIL_ENGINEERING, IndustryFilters.ELECTRONIC_MANUFACTURING),
+    "legal": (IndustryFilters.LEGAL_SERVICES,),
+    "automotive": (IndustryFilters.MOTOR_VEHICLES,),
+    "energy": (IndustryFilters.OIL_GAS,),
+    "recruiting": (IndustryFilters.STAFFING_RECRUITING,),
+    "environmental": (IndustryFilters.ENVIRONMENTAL_SERVICES,),
+    "gaming": (IndustryFilters.COMPUTER_GAMES,),
+    "information": (IndustryFilters.INFORMATION_SERVICES,)
+}
+
+@lru_cache(maxsize=128)
+def _map_experience_level(experience_years_min: Optional[int]) -> Tuple[ExperienceLevelFilters, ...]:
+    """Map experience years to LinkedIn experience level filters"""
+    if not experience_years_min:
+        return ()
+        
+    if experience_years_min <= 1:
+        return (ExperienceLevelFilters.INTERNSHIP, ExperienceLevelFilters.ENTRY_LEVEL)
+    elif experience_years_min <= 3:
+        return (ExperienceLevelFilters.ASSOCIATE,)
+    elif experience_years_min <= 5:
+        return (ExperienceLevelFilters.MID_SENIOR,)
+    else:
+        return (ExperienceLevelFilters.DIRECTOR,)
+
+@lru_cache(maxsize=128)
+def _map_industry(industry: Optional[str]) -> Tuple[IndustryFilters, ...]:
+    """Map industry string to LinkedIn industry filters"""
+    if not industry:
+        return ()
+        
+    # Look for matches in the industry map
+    industry_lower = industry.lower()
+    for key, filters in _INDUSTRY_MAP.items():
+        if key in industry_lower:
+            return filters
+            
+    # Default to empty tuple if no match found
+    return ()
+
+@lru_cache(maxsize=64)
+def _build_filters(experience: Tuple[ExperienceLevelFilters, ...], industry: Tuple[IndustryFilters, ...],
+                   remote: bool) -> QueryFilters:
+    """
+    Build the QueryFilters for a search. The scraper only reads filters, so one instance
+    is reused for every search with the same experience bucket, industry and remote flag.
+    """
+    filters = QueryFilters(
+        relevance=RelevanceFilters.RECENT,
+        time=TimeFilters.MONTH,
+        type=[TypeFilters.FULL_TIME],
+        experience=list(experience),
+        industry=list(industry) if industry else None
+    )
+    
+    # Handle remote work preference if specified
+    if remote:
+        filters.on_site_or_remote = [OnSiteOrRemoteFilters.REMOTE]
+    return filters
+
+def _filters_key(search_params: Dict[str, Any]) -> Tuple[Tuple, Tuple, bool]:
+    """The LinkedIn filters of a search: experience levels, industries and remote."""
+    location = search_params.get("location", {})
+    return (
+        _map_experience_level(search_params.get("experience_years_min")),
+        _map_industry(search_params.get("industry", "")),
+        bool(location and location.get("remote", False))
+    )
+
+# A scraped job as handed from the scraper thread to the search. The lowercased fields
+# are computed once on ingestion and used by filtering and scoring.
+class _ScrapedJob(NamedTuple):
+    title: str
+    company: str
+    location: str
+    link: str
+    skills: List[str]
+    title_lower: str
+    title_words: FrozenSet[str]
+    company_lower: str
+    location_lower: str
+    skills_lower: FrozenSet[str]
+
+_SCRAPER_NOT_INITIALIZED = "LinkedIn scraper not initialized. Please check if LINKEDIN_COOKIES_LI_AT is set correctly."
+
+def _error_result(message: str, limit: int) -> Dict[str, Any]:
+    """Response returned when a LinkedIn search fails."""
+    return {
+        "error": "LinkedIn search failed",
+        "message": message,
+        "candidates": [],
+        "total_found": 0,
+        "limit": limit,
+        "credits_used": 0,
+        "cache_hits": 0
+    }
+
+async def _iter_result(result: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Replays a complete find_candidates result in the find_candidates_stream format."""
+    metadata = dict(result)
+    for candidate in metadata.pop("candidates"):
+        yield candidate
+    yield metadata
+
+def _excluded_company_matcher(excluded_companies: List[str]) -> Callable[[str], bool]:
+    """Returns a predicate telling whether a lowercased company name contains any excluded name."""
+    excluded = tuple(ex_company.lower() for ex_company in excluded_companies)
+    # Long exclude lists are matched with a single scan per company: an Aho-Corasick
+    # automaton when pyahocorasick is installed, an alternation regex otherwise
+    if len(excluded) > 16 and ahocorasick is not None:
+        # An empty name is contained in every company, which the automaton cannot express
+        if "" in excluded:
+            return lambda company_lower: True
+        automaton = ahocorasick.Automaton()
+        for ex_company in excluded:
+            automaton.add_word(ex_company, ex_company)
+        automaton.make_automaton()
+        return lambda company_lower: next(automaton.iter(company_lower), None) is not None
+    if len(excluded) > 16:
+        excluded_re = re.compile("|".join(re.escape(ex_company) for ex_company in excluded))
+        return lambda company_lower: excluded_re.search(company_lower) is not None
+    return lambda company_lower: any(ex_company in company_lower for ex_company in excluded)
+
+# Sort key of candidate entries
+_relevance_score = itemgetter("relevance_score")
+
+def _make_candidate(job: _ScrapedJob, relevance_score: float) -> Dict[str, Any]:
+    """Create a candidate entry from job data."""
+    return {
+        "name": f"Candidate at {job.company}",  # LinkedIn jobs don't provide candidate names
+        "profile_url": job.link,
+        "current_position": f"{job.title} at {job.company}",
+        "location": job.location,
+        "skills": job.skills,
+        "experience": [
+            {
+                "title": job.title,
+                "company": job.company,
+                "duration": "Current"
+            }
+        ],
+        "education": [],  # LinkedIn jobs don't provide education details
+        "relevance_score": relevance_score
+    }
+
+def _log_run_failure(task: asyncio.Future):
+    """Done-callback of a scraper run, retrieving its exception."""
+    if task.cancelled():
+        return
+    e = task.exception()
+    if e is not None:
+        logger.error("LinkedIn scraper run failed", extra={"error": str(e)})
+
+class _ScraperSlot:
+    """
+    A pooled scraper. Its DATA listener is registered once and forwards the events to
+    the run currently holding the slot.
+    """
+    def __init__(self, scraper: LinkedinScraper):
+        self.scraper = scraper
+        self.on_data: Optional[Callable[[EventData], None]] = None
+    
+    def dispatch(self, data: EventData):
+        on_data = self.on_data
+        if on_data is not None:
+            on_data(data)
+
+# Location the library searches when a query has none
+_ANY_LOCATION = "Worldwide"
+
+class _JobCollector:
+    """
+    Ingestion state of one search. The scraper's DATA listener calls on_data from its
+    worker threads; kept jobs are handed to the event loop through 'queue', where a None
+    item marks the end of the stream. Jobs from excluded companies are not queued, and
+    at most 'target' jobs are taken in.
+    """
+    def __init__(self, loop: asyncio.AbstractEventLoop, target: int,
+                 is_excluded: Callable[[str], bool], extract_skills: Callable[[str], List[str]]):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.target = target
+        self.is_excluded = is_excluded
+        self.extract_skills = extract_skills
+        self.lock = threading.Lock()
+        self.received = 0
+        self.capped = False
+        self.task: Optional[asyncio.Future] = None
+    
+    def put(self, job: Optional[_ScrapedJob]):
+        """Queue a job (or the end marker) from any thread."""
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, job)
+    
+    def on_data(self, data: EventData):
+        """Handle job data events from the scraper"""
+        logger.debug(f"LinkedIn scraper got data: {data.title}, {data.company}")
+        
+        # Jobs beyond limit * 2 for this search (several location queries each return up
+        # to that many) are dropped
+        with self.lock:
+            if self.received >= self.target:
+                return
+            self.received += 1
+            capped = self.received >= self.target
+            if capped:
+                self.capped = True
+        
+        # Filter jobs based on excluded companies before doing any work on them
+        company_lower = (data.company or "").lower()
+        if not self.is_excluded(company_lower):
+            # Extract skills from description
+            skills = self.extract_skills(data.description)
+            title_lower = (data.title or "").lower()
+            
+            # Only the fields a candidate is built from are kept, plus their lowercased forms
+            self.put(_ScrapedJob(
+                title=data.title,
+                company=data.company,
+                location=data.place,
+                link=data.link,
+                skills=skills,
+                title_lower=title_lower,
+                title_words=frozenset(title_lower.split()),
+                company_lower=company_lower,
+                location_lower=(data.place or "").lower(),
+                skills_lower=frozenset(skills)  # extracted skills are already lowercase
+            ))
+        
+        # The cap ends the stream for the search even though the run itself goes on
+        if capped:
+            self.put(None)
+
+class _BatchRun:
+    """
+    The queries of the searches sharing one scraper run. Jobs are routed back to the
+    searches by the query text and location they were found for (all EventData tells);
+    searches asking for the same ones with the same filters share a single query.
+    """
+    def __init__(self):
+        self.queries: Dict[Tuple[str, str], Query] = {}
+        self.filters: Dict[Tuple[str, str], Tuple] = {}
+        self.routes: Dict[Tuple[str, str], List[_JobCollector]] = {}
+        self.searches = []  # (index, search_params, limit, cache_key, collector)
+    
+    def accepts(self, queries: List[Query], filters_key: Tuple) -> bool:
+        """Whether the queries can join this run without mixing up jobs of other filters."""
+        return all(
+            self.filters.get((query.query, query.options.locations[0]), filters_key) == filters_key
+            for query in queries
+        )
+    
+    def add(self, queries: List[Query], filters_key: Tuple, collector: _JobCollector):
+        for query in queries:
+            key = (query.query, query.options.locations[0])
+            self.filters[key] = filters_key
+            routed = self.routes.setdefault(key, [])
+            if collector not in routed:
+                routed.append(collector)
+            if key not in self.queries or self.queries[key].options.limit < query.options.limit:
+                self.queries[key] = query
+    
+    def collectors(self) -> List[_JobCollector]:
+        return [search[4] for search in self.searches]
+    
+    def on_data(self, data: EventData):
+        for collector in self.routes.get((data.query, data.location), ()):
+            collector.on_data(data)
+
+# Relevance score weights. The company component is a placeholder (we don't have much
+# company data), so it always contributes the same middle score.
+_TITLE_WEIGHT = 0.35
+_SKILLS_WEIGHT = 0.3
+_LOCATION_WEIGHT = 0.25
+_COMPANY_WEIGHT = 0.1
+_COMPANY_COMPONENT = 0.5 * _COMPANY_WEIGHT
+
+# Search-side values used by relevance scoring, computed once per search
+class _ScoringContext(NamedTuple):
+    jt_lower: str
+    jt_words: FrozenSet[str]
+    req_skills: FrozenSet[str]
+    req_skill_count: int
+    loc_parts: Tuple[str, ...]
+    loc_part_score: float
+    total_weight: float
+    base_score: float
+
 class LinkedInService:
     """
     Service for finding candidates on LinkedIn based on job requirements.
@@ -25,18 +388,28 @@ class LinkedInService:
     """
     def __init__(self):
         # Rate limiter to prevent excessive calls
-        self.rate_limiter = RateLimiter(5, 60_000)  # 5 requests per minute
-        self.scraper = None
+        self.rate_limiter = RateLimiter(5, 60_000, name="linkedin")  # 5 requests per minute
         self.li_at_cookie = None
+        self._search_cache = TTLCache(maxsize=256, ttl=_SEARCH_CACHE_TTL)
+        # Results of the find_candidates searches currently running, by cache key
+        self._pending: Dict[str, asyncio.Future] = {}
+        # find_candidates searches waiting to be batched (see _search_coalesced)
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batch_worker: Optional[asyncio.Future] = None
+        self._batch_tasks: Set[asyncio.Future] = set()
         
         # Parse LinkedIn cookie from environment variable
         self._parse_linkedin_cookie()
         
-        # Initialize the scraper
-        self.init_scraper()
-        
-        # Storage for collected job data during scraping
-        self.collected_jobs = []
+        # Each search runs on a scraper of its own, taken from this pool (see _acquire_scraper),
+        # so no per-search state lives on the service and concurrent searches do not interfere
+        self._scraper_pool: asyncio.Queue = asyncio.Queue()
+        self._scrapers_created = 0
+        # Scraper runs last minutes; they get threads of their own (one per pooled scraper)
+        # rather than holding tokens of the threadpool shared with the request handlers
+        self._run_executor = ThreadPoolExecutor(max_workers=config.linkedin_max_scrapers,
+                                                thread_name_prefix="linkedin-run")
         
     def _parse_linkedin_cookie(self):
         """Parse LinkedIn li_at cookie from the environment variable"""
@@ -54,64 +427,40 @@ class LinkedInService:
             logger.error(f"Error parsing LinkedIn cookie: {str(e)}")
             self.li_at_cookie = None
         
-    def init_scraper(self):
-        """Initialize the LinkedIn scraper with authenticated session"""
+    def _create_scraper(self) -> Optional[_ScraperSlot]:
+        """
+        Create a LinkedIn scraper for the pool. The library broadcasts events to every
+        listener of a scraper, so a scraper serves one run at a time.
+        Returns None if the scraper could not be created.
+        """
         try:
-            logger.info("Initializing LinkedIn scraper...")
+            logger.debug("Initializing LinkedIn scraper...")
             
-            # Set the LI_AT_COOKIE environment variable for the scraper
-            if self.li_at_cookie:
-                logger.info("Setting LI_AT_COOKIE environment variable for LinkedIn scraper")
-                os.environ["LI_AT_COOKIE"] = self.li_at_cookie
-            else:
+            # LI_AT_COOKIE itself is exported at module import
+            if not self.li_at_cookie:
                 logger.warning("No li_at cookie available. LinkedIn scraper may fail. Make sure LINKEDIN_COOKIES_LI_AT is set.")
             
             # Configure the scraper with higher slow_mo value for authenticated sessions
-            self.scraper = LinkedinScraper(
+            scraper = LinkedinScraper(
                 chrome_executable_path=None,
                 chrome_binary_location=None,
                 chrome_options=None,
                 headless=True,
-                max_workers=1,  # Single worker to avoid rate limiting
+                max_workers=config.linkedin_max_workers,  # One browser per concurrent query
                 slow_mo=1.3,    # Higher value (1.3+) for authenticated sessions as per docs
                 page_load_timeout=40
             )
             
             # Register event listeners
-            self.scraper.on(Events.DATA, self._on_data)
-            self.scraper.on(Events.ERROR, self._on_error)
-            self.scraper.on(Events.END, self._on_end)
+            slot = _ScraperSlot(scraper)
+            scraper.on(Events.DATA, slot.dispatch)
+            scraper.on(Events.ERROR, self._on_error)
+            scraper.on(Events.END, self._on_end)
             
-            logger.info("LinkedIn scraper initialized successfully")
+            return slot
         except Exception as e:
             logger.error(f"Failed to initialize LinkedIn scraper: {str(e)}", exc_info=True)
-            # Set to None so we can check if initialization failed
-            self.scraper = None
-    
-    def _on_data(self, data: EventData):
-        """Handle job data events from the scraper"""
-        logger.debug(f"LinkedIn scraper got data: {data.title}, {data.company}")
-        
-        # Extract skills from description
-        skills = self._extract_skills(data.description)
-        
-        # Format and store the job data
-        job_data = {
-            "job_id": data.job_id,
-            "title": data.title,
-            "company": data.company,
-            "company_link": data.company_link,
-            "location": data.place,
-            "date_posted": data.date,
-            "link": data.link,
-            "apply_link": data.apply_link,
-            "description": data.description,
-            "extracted_skills": skills,
-            "date_text": data.date_text,
-            "insights": data.insights
-        }
-        
-        self.collected_jobs.append(job_data)
+            return None
     
     def _on_metrics(self, metrics: EventMetrics):
         """Handle metrics events from the scraper"""
@@ -127,111 +476,42 @@ class LinkedInService:
     
     def _extract_skills(self, text: str) -> List[str]:
         """Extract potential skills from job description text"""
-        # Common tech skills to look for
-        tech_skills = [
-            "python", "java", "javascript", "c\\+\\+", "ruby", "php", "scala", "go", "rust",
-            "react", "angular", "vue", "node\\.js", "django", "flask", "spring", "rails",
-            "aws", "azure", "gcp", "docker", "kubernetes", "terraform", "ci/cd",
-            "machine learning", "artificial intelligence", "data science", "big data",
-            "sql", "nosql", "mongodb", "postgresql", "mysql", "oracle", "sql server",
-            "agile", "scrum", "kanban", "devops", "sre", "tdd", "bdd"
-        ]
-        
-        # Look for skills in the text
-        found_skills = []
-        for skill in tech_skills:
-            if re.search(f"\\b{skill}\\b", text.lower()):
-                # Clean up the skill name
-                clean_skill = skill.replace("\\", "").replace("\\+\\+", "++")
-                found_skills.append(clean_skill)
-                
-        return found_skills
-    
-    def _map_experience_level(self, experience_years_min: Optional[int]) -> List[ExperienceLevelFilters]:
-        """Map experience years to LinkedIn experience level filters"""
-        if not experience_years_min:
+        if not text:
             return []
-            
-        if experience_years_min <= 1:
-            return [ExperienceLevelFilters.INTERNSHIP, ExperienceLevelFilters.ENTRY_LEVEL]
-        elif experience_years_min <= 3:
-            return [ExperienceLevelFilters.ASSOCIATE]
-        elif experience_years_min <= 5:
-            return [ExperienceLevelFilters.MID_SENIOR]
+        if SKILLS_AC is not None:
+            # One automaton pass over the lowercased text reports every occurrence of every
+            # skill (overlapping ones included); keep those that are whole words
+            lowered = text.lower()
+            last = len(lowered) - 1
+            found = set()
+            for end, skill in SKILLS_AC.iter(lowered):
+                start = end - len(skill) + 1
+                if (start == 0 or not _is_word_char(lowered[start - 1])) and \
+                        (end == last or not _is_word_char(lowered[end + 1])):
+                    found.add(skill)
         else:
-            return [ExperienceLevelFilters.DIRECTOR]
-    
-    def _map_industry(self, industry: Optional[str]) -> List[IndustryFilters]:
-        """Map industry string to LinkedIn industry filters"""
-        if not industry:
-            return []
-            
-        industry_map = {
-            "technology": [IndustryFilters.TECHNOLOGY_INTERNET, IndustryFilters.IT_SERVICES, IndustryFilters.SOFTWARE_DEVELOPMENT],
-            "finance": [IndustryFilters.FINANCIAL_SERVICES, IndustryFilters.BANKING, IndustryFilters.INVESTMENT_BANKING, IndustryFilters.INVESTMENT_MANAGEMENT],
-            "aviation": [IndustryFilters.AIRLINES_AVIATION],
-            "engineering": [IndustryFilters.CIVIL_ENGINEERING, IndustryFilters.ELECTRONIC_MANUFACTURING],
-            "legal": [IndustryFilters.LEGAL_SERVICES],
-            "automotive": [IndustryFilters.MOTOR_VEHICLES],
-            "energy": [IndustryFilters.OIL_GAS],
-            "recruiting": [IndustryFilters.STAFFING_RECRUITING],
-            "environmental": [IndustryFilters.ENVIRONMENTAL_SERVICES],
-            "gaming": [IndustryFilters.COMPUTER_GAMES],
-            "information": [IndustryFilters.INFORMATION_SERVICES]
-        }
-        
-        # Look for matches in the industry map
-        industry_lower = industry.lower()
-        for key, filters in industry_map.items():
-            if key in industry_lower:
-                return filters
-                
-        # Default to empty list if no match found
-        return []
+            # Without the automaton each skill is looked up with str.find, which is far
+            # cheaper than a regex scan; the first whole-word occurrence is enough
+            lowered = text.lower()
+            size = len(lowered)
+            found = set()
+            for skill in TECH_SKILLS:
+                start = lowered.find(skill)
+                while start != -1:
+                    end = start + len(skill)
+                    if (start == 0 or not _is_word_char(lowered[start - 1])) and \
+                            (end == size or not _is_word_char(lowered[end])):
+                        found.add(skill)
+                        break
+                    start = lowered.find(skill, start + 1)
+        return [skill for skill in TECH_SKILLS if skill in found]
     
-    async def find_candidates(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        Search for candidates on LinkedIn based on job requirements.
-        
-        Args:
-            search_params: Dictionary containing search parameters
-                
-        Returns:
-            Dictionary with candidates and metadata
-        """
-        logger.debug("LinkedInService: find_candidates called", extra={"params": search_params})
-        
-        # Apply rate limiting
-        await self.rate_limiter.check()
-        
-        # Check if scraper was initialized successfully
-        if not self.scraper:
-            error_msg = "LinkedIn scraper not initialized. Please check if LINKEDIN_COOKIES_LI_AT is set correctly."
-            logger.error(error_msg)
-            return {
-                "error": "LinkedIn search failed",
-                "message": error_msg,
-                "candidates": [],
-                "total_found": 0,
-                "limit": search_params.get("limit", 10),
-                "credits_used": 0,
-                "cache_hits": 0
-            }
-        
-        # Reset collected jobs for this search
-        self.collected_jobs = []
-        
+    def _build_queries(self, search_params: Dict[str, Any], limit: int) -> List[Query]:
+        """Build the LinkedIn queries for a search, one per requested location."""
         # Extract search parameters
-        job_title = search_params.get("job_title", "")
+        job_title = (search_params.get("job_title") or "").strip()
         skills = search_params.get("skills", [])
         location = search_params.get("location", {})
-        education = search_params.get("education", {})
-        experience_years_min = search_params.get("experience_years_min")
-        industry = search_params.get("industry", "")
-        company_size = search_params.get("company_size", "")
-        limit = min(search_params.get("limit", 10), 100)
-        excluded_companies = search_params.get("excluded_companies", [])
-        excluded_profiles = search_params.get("excluded_profiles", [])
         
         # Prepare location string for LinkedIn search
         locations = []
@@ -243,21 +523,8 @@ class LinkedInService:
             if location.get("city"):
                 locations.append(location["city"])
         
-        # Map industry string to LinkedIn industry filters
-        industry_filters = self._map_industry(industry)
-        
-        # Set up query filters
-        filters = QueryFilters(
-            relevance=RelevanceFilters.RECENT,
-            time=TimeFilters.MONTH,
-            type=[TypeFilters.FULL_TIME],
-            experience=self._map_experience_level(experience_years_min),
-            industry=industry_filters if industry_filters else None
-        )
-        
-        # Handle remote work preference if specified
-        if location and location.get("remote", False):
-            filters.on_site_or_remote = [OnSiteOrRemoteFilters.REMOTE]
+        # Set up query filters (shared between searches that map to the same filters)
+        filters = _build_filters(*_filters_key(search_params))
         
         # If we have skills, add them to the query string
         query_text = job_title
@@ -266,157 +533,518 @@ class LinkedInService:
             skills_text = " ".join(primary_skills)
             query_text = f"{job_title} {skills_text}"
         
-        # Create query
-        query = Query(
-            query=query_text,
-            options=QueryOptions(
-                locations=locations if locations else None,
-                apply_link=True,
-                skip_promoted_jobs=True,
-                limit=limit * 2,  # Get more results to account for filtering
-                filters=filters
+        # Create one query per location so the scraper can run them on separate workers
+        # (a single query walks its locations one after another in one browser)
+        return [
+            Query(
+                query=query_text,
+                options=QueryOptions(
+                    # Spelled out so that jobs can be routed back by EventData.location
+                    locations=[loc or _ANY_LOCATION],
+                    apply_link=True,
+                    skip_promoted_jobs=True,
+                    limit=limit * 2,  # Get more results to account for filtering
+                    filters=filters
+                )
             )
-        )
+            for loc in (locations or [None])
+        ]
+    
+    async def _acquire_scraper(self) -> Optional[_ScraperSlot]:
+        """
+        Take a scraper from the pool, creating one while fewer than
+        config.linkedin_max_scrapers exist, and otherwise waiting for a run to give one back.
+        Returns None if the scraper could not be created.
+        """
+        if self._scraper_pool.empty() and self._scrapers_created < config.linkedin_max_scrapers:
+            self._scrapers_created += 1
+            slot = await run_in_threadpool(self._create_scraper)
+            if slot is None:
+                self._scrapers_created -= 1
+            return slot
+        return await self._scraper_pool.get()
+    
+    async def _start_scrape(self, queries: List[Query], on_data: Callable[[EventData], None],
+                            collectors: List[_JobCollector]) -> bool:
+        """
+        Start running the queries on a pooled scraper in the thread pool. The jobs are
+        handed to 'on_data', and every collector gets the end marker once the run is over.
+        Returns False if the scraper could not be created.
+        """
+        slot = await self._acquire_scraper()
+        if slot is None:
+            return False
+        slot.on_data = on_data
+        loop = asyncio.get_running_loop()
+        
+        def run_scraper():
+            try:
+                slot.scraper.run(queries)
+            finally:
+                slot.on_data = None
+                loop.call_soon_threadsafe(self._scraper_pool.put_nowait, slot)
+                # None marks the end of the stream
+                for collector in collectors:
+                    collector.put(None)
+        
+        # Run the scraper in its own thread to not block the async loop, and consume
+        # jobs as they arrive instead of waiting for the whole run
+        task = loop.run_in_executor(self._run_executor, run_scraper)
+        # Searches that already have enough jobs do not await the run; its failure is
+        # retrieved (and logged) here instead
+        task.add_done_callback(_log_run_failure)
+        for collector in collectors:
+            collector.task = task
+        return True
+    
+    def _new_collector(self, search_params: Dict[str, Any], limit: int) -> _JobCollector:
+        """Create the collector for a search that returns up to 'limit' candidates."""
+        is_excluded = _excluded_company_matcher(search_params.get("excluded_companies", []))
+        return _JobCollector(asyncio.get_running_loop(), limit * 2, is_excluded, self._extract_skills)
+    
+    async def _prepare_search(self, search_params: Dict[str, Any], limit: int) -> Optional[_JobCollector]:
+        """
+        Rate-limit the search and start the scrape.
+        Returns None if the scraper could not be initialized.
+        """
+        # Apply rate limiting (a full window delays the search rather than failing it)
+        await self.rate_limiter.acquire()
         
+        queries = self._build_queries(search_params, limit)
+        
+        # Each additional query is another LinkedIn search and counts against the rate limit
+        for _ in queries[1:]:
+            await self.rate_limiter.acquire()
+        
+        collector = self._new_collector(search_params, limit)
+        if not await self._start_scrape(queries, collector.on_data, [collector]):
+            logger.error(_SCRAPER_NOT_INITIALIZED)
+            return None
+        return collector
+    
+    def _get_cached(self, search_params: Dict[str, Any], cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the cached result for a search, marked as a cache hit.
+        "cache_control": "no-cache" in the search parameters bypasses the cache.
+        """
+        if search_params.get("cache_control") == "no-cache":
+            return None
+        cached = self._search_cache.get(cache_key)
+        if cached is None:
+            return None
+        logger.debug("Returning cached LinkedIn candidates", extra={"key": cache_key})
+        result = copy.deepcopy(cached)
+        result["cache_hits"] = 1
+        return result
+    
+    async def _join_pending(self, search_params: Dict[str, Any], cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        If an identical find_candidates search is already running, wait for it and return
+        a copy of its result, marked as a cache hit. Returns None if there is none, or if
+        it did not finish. Like the cache, "cache_control": "no-cache" skips this.
+        """
+        if search_params.get("cache_control") == "no-cache":
+            return None
+        pending = self._pending.get(cache_key)
+        if pending is None:
+            return None
+        logger.debug("Joining running LinkedIn search", extra={"key": cache_key})
+        try:
+            result = copy.deepcopy(await asyncio.shield(pending))
+        except asyncio.CancelledError:
+            if not pending.cancelled():
+                raise  # this caller itself was cancelled
+            return None
+        if "error" not in result:
+            result["cache_hits"] = 1
+        return result
+    
+    async def find_candidates(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Search for candidates on LinkedIn based on job requirements.
+        
+        Args:
+            search_params: Dictionary containing search parameters
+                
+        Returns:
+            Dictionary with candidates and metadata
+        """
+        logger.debug("LinkedInService: find_candidates called", extra={"params": search_params})
+        
+        # Repeated searches are served from the cache without touching the rate limit
+        cache_key = _search_cache_key(search_params)
+        cached = self._get_cached(search_params, cache_key)
+        if cached is not None:
+            return cached
+        
+        # Concurrent identical searches share one scrape
+        joined = await self._join_pending(search_params, cache_key)
+        if joined is not None:
+            return joined
+        
+        pending = asyncio.get_running_loop().create_future()
+        self._pending[cache_key] = pending
         try:
-            # Run the scraper in a thread pool to not block the async loop
-            await run_in_threadpool(lambda: self.scraper.run([query]))
+            # Searches arriving together are scraped in one run
+            result = await self._search_coalesced(search_params)
+            pending.set_result(result)
+            return result
+        finally:
+            # Searches that joined fall back to scraping themselves if this one did not finish
+            if not pending.done():
+                pending.cancel()
+            if self._pending.get(cache_key) is pending:
+                del self._pending[cache_key]
+    
+    async def _collect_result(self, collector: _JobCollector, search_params: Dict[str, Any],
+                              limit: int, cache_key: str) -> Dict[str, Any]:
+        """Consume the job queue of a started search and build its scored, cached result."""
+        try:
+            # The scoring inputs of kept jobs are stored column-wise; scoring only walks those
+            jobs = []
+            titles, title_words, locations, skills_sets = [], [], [], []
+            while len(jobs) < limit:
+                job = await collector.queue.get()
+                if job is None:
+                    break
+                jobs.append(job)
+                titles.append(job.title_lower)
+                title_words.append(job.title_words)
+                locations.append(job.location_lower)
+                skills_sets.append(job.skills_lower)
             
-            # Process collected jobs to extract candidate information
-            candidates = []
-            total_found = len(self.collected_jobs)
+            # The run ended before the limit was reached; surface any scraper failure
+            if len(jobs) < limit and not collector.capped:
+                await collector.task
             
-            # Filter jobs based on excluded companies
-            filtered_jobs = [
-                job for job in self.collected_jobs
-                if not any(ex_company.lower() in job["company"].lower() for ex_company in excluded_companies)
-            ]
+            # Calculate relevance scores based on job title, skills and location match
+            relevance_scores = self._score_jobs_batch(titles, title_words, locations, skills_sets, search_params)
             
-            for job in filtered_jobs[:limit]:
-                # Calculate relevance score based on job title and skills match
-                relevance_score = self._calculate_relevance_score(job, search_params)
-                
-                # Create candidate entry from job data
-                candidate = {
-                    "name": f"Candidate at {job['company']}",  # LinkedIn jobs don't provide candidate names
-                    "profile_url": job["link"],
-                    "current_position": f"{job['title']} at {job['company']}",
-                    "location": job["location"],
-                    "skills": job["extracted_skills"],
-                    "experience": [
-                        {
-                            "title": job["title"],
-                            "company": job["company"],
-                            "duration": "Current"
-                        }
-                    ],
-                    "education": [],  # LinkedIn jobs don't provide education details
-                    "relevance_score": relevance_score
-                }
-                
-                candidates.append(candidate)
+            # Top 'limit' jobs by relevance score, without sorting the whole batch
+            order = heapq.nlargest(limit, range(len(jobs)), key=relevance_scores.__getitem__)
             
-            # Sort by relevance score
-            candidates.sort(key=lambda c: c["relevance_score"], reverse=True)
+            # Create candidate entries only for the jobs that are returned
+            candidates = [_make_candidate(jobs[i], relevance_scores[i]) for i in order]
             
             # Return the results
-            return {
-                "candidates": candidates[:limit],
-                "total_found": total_found,
+            result = {
+                "candidates": candidates,
+                # Jobs the search took in: the run may still be scraping, so counting what the
+                # collector has received so far would depend on timing
+                "total_found": len(jobs),
                 "limit": limit,
                 "credits_used": 0,  # Not applicable for this implementation
-                "cache_hits": 0      # Not applicable for this implementation
+                "cache_hits": 0
             }
+            self._search_cache[cache_key] = copy.deepcopy(result)
+            return result
+            
+        except Exception as e:
+            # Scrape failures repeat under LinkedIn throttling; the traceback is only worth
+            # formatting when debugging
+            if config.enable_debug:
+                logger.exception("Error in LinkedIn search")
+            else:
+                logger.error("Error in LinkedIn search", extra={"error": str(e)})
+            return _error_result(str(e), limit)
+    
+    async def find_candidates_batch(self, params_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several candidate searches in a single scraper run, so that they share its
+        browser workers instead of each starting a run of its own.
+        
+        Args:
+            params_list: List of search parameter dictionaries, as for find_candidates
+                
+        Returns:
+            List with the find_candidates result of each search, in the same order
+        """
+        logger.debug("LinkedInService: find_candidates_batch called", extra={"count": len(params_list)})
+        return list(await asyncio.gather(*await self._start_batch(params_list)))
+    
+    async def _start_batch(self, params_list: List[Dict[str, Any]]) -> List[asyncio.Future]:
+        """
+        Start the scraper runs for a batch of searches. Returns one future per search,
+        resolving to its find_candidates result as soon as that search is complete.
+        """
+        loop = asyncio.get_running_loop()
+        results: List[Optional[asyncio.Future]] = [None] * len(params_list)
+        runs: List[_BatchRun] = []
+        for i, search_params in enumerate(params_list):
+            cache_key = _search_cache_key(search_params)
+            cached = self._get_cached(search_params, cache_key)
+            if cached is not None:
+                results[i] = loop.create_future()
+                results[i].set_result(cached)
+                continue
+            
+            limit = min(search_params.get("limit", 10), 100)
+            collector = self._new_collector(search_params, limit)
+            queries = self._build_queries(search_params, limit)
+            filters_key = _filters_key(search_params)
+            # Jobs are routed back by the query text and location only, so a search goes
+            # to a run where no query with those but other filters is scheduled
+            run = next((run for run in runs if run.accepts(queries, filters_key)), None)
+            if run is None:
+                run = _BatchRun()
+                runs.append(run)
+            run.add(queries, filters_key, collector)
+            run.searches.append((i, search_params, limit, cache_key, collector))
+        
+        for run in runs:
+            # Every query is a LinkedIn search and counts against the rate limit
+            for _ in run.queries:
+                await self.rate_limiter.acquire()
             
+            if await self._start_scrape(list(run.queries.values()), run.on_data, run.collectors()):
+                for i, search_params, limit, cache_key, collector in run.searches:
+                    results[i] = asyncio.ensure_future(
+                        self._collect_result(collector, search_params, limit, cache_key))
+            else:
+                logger.error(_SCRAPER_NOT_INITIALIZED)
+                for i, search_params, _, _, _ in run.searches:
+                    results[i] = loop.create_future()
+                    results[i].set_result(_error_result(_SCRAPER_NOT_INITIALIZED, search_params.get("limit", 10)))
+        
+        return results
+    
+    async def _search_coalesced(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a find_candidates search together with the others arriving within
+        _BATCH_WINDOW seconds, in a single scraper run (see _start_batch).
+        """
+        loop = asyncio.get_running_loop()
+        if self._batch_worker is None or self._batch_worker.done() or self._batch_loop is not loop:
+            self._batch_queue = asyncio.Queue()
+            self._batch_loop = loop
+            self._batch_worker = asyncio.ensure_future(self._run_batches(self._batch_queue))
+        started = loop.create_future()
+        self._batch_queue.put_nowait((search_params, started))
+        # Resolves to the search's own future once the batch's run has started
+        return await (await started)
+    
+    async def _run_batches(self, batch_queue: asyncio.Queue):
+        """Background task grouping queued searches into batches."""
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await batch_queue.get()]
+            deadline = loop.time() + _BATCH_WINDOW
+            while len(items) < _BATCH_MAX_SEARCHES:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(batch_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Start the batch without holding up the next one (rate limiting may wait),
+            # keeping a reference so the task is not garbage collected while it runs
+            task = asyncio.ensure_future(self._start_coalesced(items))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _start_coalesced(self, items: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            futures = await self._start_batch([search_params for search_params, _ in items])
         except Exception as e:
-            logger.error("Error in LinkedIn search", extra={"error": str(e)})
-            return {
-                "error": "LinkedIn search failed",
-                "message": str(e),
-                "candidates": [],
-                "total_found": 0,
+            for _, started in items:
+                if not started.done():
+                    started.set_exception(e)
+            return
+        for (_, started), future in zip(items, futures):
+            if not started.done():
+                started.set_result(future)
+    
+    async def find_candidates_stream(self, search_params: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of find_candidates. Rate limiting and scraper start-up happen
+        before this returns, so their errors reach the caller before anything is sent.
+        
+        Returns:
+            Async iterator yielding one dict per candidate as soon as its job is scraped and
+            scored (in arrival order), then a final dict with the metadata (total_found,
+            limit, credits_used, cache_hits) or with "error"/"message" if the search failed.
+        """
+        logger.debug("LinkedInService: find_candidates_stream called", extra={"params": search_params})
+        
+        cache_key = _search_cache_key(search_params)
+        cached = self._get_cached(search_params, cache_key)
+        if cached is not None:
+            return _iter_result(cached)
+        
+        joined = await self._join_pending(search_params, cache_key)
+        if joined is not None:
+            return _iter_result(joined)
+        
+        limit = min(search_params.get("limit", 10), 100)
+        collector = await self._prepare_search(search_params, limit)
+        if collector is None:
+            return _iter_result(_error_result(_SCRAPER_NOT_INITIALIZED, search_params.get("limit", 10)))
+        
+        return self._stream_candidates(collector, search_params, limit, cache_key)
+    
+    async def _stream_candidates(self, collector: _JobCollector, search_params: Dict[str, Any],
+                                 limit: int, cache_key: str) -> AsyncIterator[Dict[str, Any]]:
+        """Consume the job queue of a started search, yielding candidates as they are scored."""
+        try:
+            score = self._job_scorer(search_params)
+            candidates = []
+            while len(candidates) < limit:
+                job = await collector.queue.get()
+                if job is None:
+                    break
+                candidate = _make_candidate(job, score(job.title_lower, job.title_words, job.location_lower, job.skills_lower))
+                candidates.append(candidate)
+                yield candidate
+            
+            # The run ended before the limit was reached; surface any scraper failure
+            if len(candidates) < limit and not collector.capped:
+                await collector.task
+            
+            metadata = {
+                "total_found": len(candidates),  # see _collect_result
                 "limit": limit,
-                "credits_used": 0,
+                "credits_used": 0,  # Not applicable for this implementation
                 "cache_hits": 0
             }
+            # Cache in the same shape as find_candidates, sorted by relevance score
+            result = dict(metadata, candidates=heapq.nlargest(limit, candidates, key=_relevance_score))
+            self._search_cache[cache_key] = copy.deepcopy(result)
+            yield metadata
+            
+        except Exception as e:
+            # Scrape failures repeat under LinkedIn throttling; the traceback is only worth
+            # formatting when debugging
+            if config.enable_debug:
+                logger.exception("Error in LinkedIn search")
+            else:
+                logger.error("Error in LinkedIn search", extra={"error": str(e)})
+            error = _error_result(str(e), limit)
+            del error["candidates"]
+            yield error
+    
+    def _build_scoring_context(self, search_params: Dict[str, Any]) -> _ScoringContext:
+        """
+        Derive everything relevance scoring needs from search_params once per search.
+        """
+        jt_lower = (search_params.get("job_title") or "").strip().lower()
+        requested_skills = [s.lower() for s in search_params.get("skills", [])]
+        location_params = search_params.get("location", {})
+        loc_parts = tuple(
+            location_params[key].lower()
+            for key in ("country", "region", "city")
+            if location_params and location_params.get(key) is not None
+        )
+        
+        # Summed in the same order as the components in _calculate_relevance_score, so
+        # the rounded scores do not depend on float summation order
+        total_weight = 0
+        if jt_lower:
+            total_weight += _TITLE_WEIGHT
+        if requested_skills:
+            total_weight += _SKILLS_WEIGHT
+        if location_params:
+            total_weight += _LOCATION_WEIGHT
+        # Company relevance (10% weight) always counts
+        total_weight += _COMPANY_WEIGHT
+        
+        return _ScoringContext(
+            jt_lower=jt_lower,
+            jt_words=frozenset(jt_lower.split()),
+            req_skills=frozenset(requested_skills),
+            req_skill_count=len(requested_skills),
+            loc_parts=loc_parts,
+            loc_part_score=1.0 / len(loc_parts) if loc_parts else 0.0,
+            total_weight=total_weight,
+            # Score of a job matching nothing: only the company component
+            base_score=round(_COMPANY_COMPONENT / total_weight, 2)
+        )
     
-    def _calculate_relevance_score(self, job: Dict[str, Any], search_params: Dict[str, Any]) -> float:
+    def _calculate_relevance_score(self, title_lower: str, title_words: FrozenSet[str], location_lower: str,
+                                   skills_lower: FrozenSet[str], ctx: _ScoringContext) -> float:
         """
         Calculate a relevance score for a job based on how well it matches the search criteria.
+        Takes the job's title (and its words), location and skills already lowercased.
         
         Returns:
-            float: A score between 0 and 1, where 1 is a perfect match
+            float: Score between 0 and 1, where 1 is a perfect match
         """
-        score_components = []
+        total_score = 0
         
         # Job title match (35% weight)
-        job_title = search_params.get("job_title", "").lower()
-        if job_title:
-            job_title_score = 0
-            current_title = job["title"].lower()
-            
+        jt_lower = ctx.jt_lower
+        if jt_lower:
             # Check for exact match
-            if job_title == current_title:
-                job_title_score = 1.0
-            # Check for partial match
-            elif job_title in current_title or current_title in job_title:
-                job_title_score = 0.8
+            if jt_lower == title_lower:
+                total_score += _TITLE_WEIGHT
+            # Check for partial match (only the shorter title can be inside the other)
+            elif (jt_lower in title_lower) if len(jt_lower) <= len(title_lower) else (title_lower in jt_lower):
+                total_score += 0.8 * _TITLE_WEIGHT
             # Check for word overlap
             else:
-                job_title_words = set(job_title.split())
-                current_title_words = set(current_title.split())
-                overlap = len(job_title_words.intersection(current_title_words))
+                overlap = len(ctx.jt_words & title_words)
                 if overlap > 0:
-                    job_title_score = 0.5 * (overlap / max(len(job_title_words), len(current_title_words)))
-                    
-            score_components.append(("title", job_title_score, 0.35))  # 35% weight
+                    total_score += 0.5 * (overlap / max(len(ctx.jt_words), len(title_words))) * _TITLE_WEIGHT
         
         # Skills match (30% weight)
-        requested_skills = [s.lower() for s in search_params.get("skills", [])]
-        if requested_skills:
-            job_skills = [s.lower() for s in job["extracted_skills"]]
-            
-            if job_skills:
-                matched_skills = set(requested_skills).intersection(job_skills)
-                skills_score = len(matched_skills) / len(requested_skills) if requested_skills else 0
-            else:
-                skills_score = 0
-                
-            score_components.append(("skills", skills_score, 0.3))  # 30% weight
+        if ctx.req_skill_count:
+            total_score += len(ctx.req_skills & skills_lower) / ctx.req_skill_count * _SKILLS_WEIGHT
         
         # Location match (25% weight)
-        location_params = search_params.get("location", {})
-        if location_params:
-            location_score = 0
-            job_location = job["location"].lower()
-            
-            # Check for country, region, city matches
-            location_parts = []
-            if "country" in location_params:
-                location_parts.append(location_params["country"].lower())
-            if "region" in location_params:
-                location_parts.append(location_params["region"].lower())
-            if "city" in location_params:
-                location_parts.append(location_params["city"].lower())
-            
-            for part in location_parts:
-                if part in job_location:
-                    location_score += 1.0 / len(location_parts) if location_parts else 0
-                    
-            score_components.append(("location", location_score, 0.25))  # 25% weight
-        
-        # Company relevance (10% weight)
-        # This is more of a placeholder since we don't have much company data
-        company_score = 0.5  # Default middle score
-        score_components.append(("company", company_score, 0.1))  # 10% weight
-        
-        # Calculate weighted average score
-        if score_components:
-            total_score = sum(score * weight for _, score, weight in score_components)
-            total_weight = sum(weight for _, _, weight in score_components)
-            return round(total_score / total_weight, 2) if total_weight > 0 else 0
-        else:
-            return 0
+        if ctx.loc_parts:
+            # At most three parts, so hits * share equals the share summed once per hit
+            hits = 0
+            for part in ctx.loc_parts:
+                hits += part in location_lower
+            total_score += hits * ctx.loc_part_score * _LOCATION_WEIGHT
+        
+        # Nothing matched (the common case when total_found >> limit)
+        if not total_score:
+            return ctx.base_score
+        
+        # Company relevance (10% weight, constant placeholder)
+        total_score += _COMPANY_COMPONENT
+        
+        # The API reports scores with two decimals
+        return round(total_score / ctx.total_weight, 2)
+    
+    def _job_scorer(self, search_params: Dict[str, Any]) -> Callable[[str, FrozenSet[str], str, FrozenSet[str]], float]:
+        """
+        Returns a function scoring one job (lowercased title, title words, location, skills) against search_params.
+        """
+        # Without a title, skills or location only the fixed company component remains,
+        # so every job scores _COMPANY_COMPONENT / _COMPANY_WEIGHT
+        if not (search_params.get("job_title") or search_params.get("skills") or search_params.get("location")):
+            return lambda title, words, location, skills: 0.5
+        
+        ctx = self._build_scoring_context(search_params)
+        return lambda title, words, location, skills: self._calculate_relevance_score(title, words, location, skills, ctx)
+    
+    def _score_jobs_batch(self, titles: List[str], title_words: List[FrozenSet[str]], locations: List[str],
+                          skills_sets: List[FrozenSet[str]], search_params: Dict[str, Any]) -> List[float]:
+        """
+        Calculate relevance scores for a batch of jobs given column-wise (lowercased), sharing one scoring context.
+        
+        Returns:
+            List[float]: One score between 0 and 1 per job, where 1 is a perfect match
+        """
+        score = self._job_scorer(search_params)
+        return [
+            score(title, words, location, skills)
+            for title, words, location, skills in zip(titles, title_words, locations, skills_sets)
+        ]
 
-# Create a singleton instance
-linkedin_service = LinkedInService()
+# Singleton instance, created on first use so that importing this module stays cheap
+_linkedin_service: Optional[LinkedInService] = None
+_linkedin_service_lock = threading.Lock()
+
+def get_linkedin_service() -> LinkedInService:
+    """
+    Returns the shared LinkedInService, constructing it on the first call.
+    """
+    global _linkedin_service
+    if _linkedin_service is None:
+        with _linkedin_service_lock:
+            if _linkedin_service is None:
+                _linkedin_service = LinkedInService()
+    return _linkedin_service
@@ -1,35 +1,92 @@
 import time
 import asyncio
+import logging
+from typing import Optional
 
 from ..config import config
 from ..utils import logger
 
+# One Redis client (and connection pool) per process, shared by every limiter and cache.
+_redis = None
+_redis_failed = False
+
+def _create_redis():
+    import redis.asyncio as redis_asyncio
+    return redis_asyncio.from_url(
+        config.redis_url,
+        max_connections=64,
+        health_check_interval=30,
+        decode_responses=False,
+        retry_on_timeout=True,
+        socket_connect_timeout=5
+    )
+
+def get_redis():
+    """
+    Returns the shared Redis client, creating it on first use.
+    Returns None if REDIS_URL is not set or the client could not be created.
+    Values come back as bytes (decode_responses=False); orjson/json accept them as-is.
+    """
+    global _redis, _redis_failed
+    if _redis is None and config.redis_url and not _redis_failed:
+        try:
+            _redis = _create_redis()
+            logger.debug("Shared Redis client created.", extra={"redis_url": config.redis_url})
+        except Exception as e:
+            _redis_failed = True
+            if config.enable_debug:
+                logger.exception("Failed to initialize Redis client for rate limiting. Falling back to in-memory.")
+            else:
+                logger.error("Failed to initialize Redis client for rate limiting. Falling back to in-memory.", extra={"error": str(e)})
+    return _redis
+
+def reset_redis():
+    """
+    Replaces the shared client after its connection was closed underneath us.
+    """
+    global _redis
+    _redis = _create_redis()
+    return _redis
+
+async def close_redis():
+    """
+    Closes the shared Redis client. Called from the FastAPI shutdown hook.
+    """
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        logger.debug("Shared Redis client closed.")
+    _redis = None
+
 class RateLimiter:
     """
     Distributed rate limiter that allows `max_requests` in `window_ms` timeframe.
     Uses Redis for distributed rate limiting if REDIS_URL is set in config,
-    otherwise falls back to in-memory rate limiting.
+    otherwise falls back to an in-memory token bucket: `max_requests` tokens that
+    refill continuously over `window_ms`.
+    `name` must be stable across workers and nodes, since it is part of the Redis key
+    that all of them share.
     """
-    def __init__(self, max_requests: int, window_ms: int):
+    def __init__(self, max_requests: int, window_ms: int, name: str):
+        self.name = name
         self.max_requests = max_requests
         self.window_ms = window_ms
-        self.queue = []
-        self.redis_client = None
-        if config.redis_url:
-            try:
-                import redis.asyncio as redis_asyncio
-                self.redis_client = redis_asyncio.from_url(
-                    config.redis_url,
-                    decode_responses=True,
-                    retry_on_timeout=True,
-                    socket_connect_timeout=5
-                )
-                logger.debug("Distributed rate limiter enabled with Redis.", extra={"redis_url": config.redis_url})
-            except Exception as e:
-                if config.enable_debug:
-                    logger.exception("Failed to initialize Redis client for rate limiting. Falling back to in-memory.")
-                else:
-                    logger.error("Failed to initialize Redis client for rate limiting. Falling back to in-memory.", extra={"error": str(e)})
+        # In-memory token bucket, refilled lazily on each request
+        self.capacity = float(max_requests)
+        self.rate = max_requests / (window_ms / 1000)  # tokens per second
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        # acquire() callers queue here, so only the first in line sleeps on a timer
+        self._acquire_lock = asyncio.Lock()
+        if get_redis() is not None:
+            logger.debug("Distributed rate limiter enabled with Redis.", extra={"limiter": name})
+
+    @property
+    def redis_client(self):
+        """
+        The process-wide Redis client (see get_redis), or None when Redis is not configured.
+        """
+        return get_redis()
 
     async def safe_execute(self, method_name: str, *args, **kwargs):
         """
@@ -42,30 +99,39 @@ class RateLimiter:
         except RuntimeError as e:
             if "closed" in str(e):
                 try:
-                    import redis.asyncio as redis_asyncio
-                    self.redis_client = redis_asyncio.from_url(
-                        config.redis_url,
-                        decode_responses=True,
-                        retry_on_timeout=True,
-                        socket_connect_timeout=5
-                    )
+                    client = reset_redis()
                     logger.debug("Reinitialized Redis client in safe_execute due to closed connection", extra={"method": method_name})
-                    return await getattr(self.redis_client, method_name)(*args, **kwargs)
+                    return await getattr(client, method_name)(*args, **kwargs)
                 except Exception as e2:
                     logger.exception("Failed to reinitialize Redis client", extra={"error": str(e2)})
                     raise e2
             else:
                 raise e
 
-    async def check(self):
+    def _window_key(self, scope: Optional[str], window: int) -> str:
+        return f"rl:{self.name}:{scope}:{window}" if scope else f"rl:{self.name}:{window}"
+
+    async def _redis_count(self, key: str) -> int:
+        """
+        Counts one request in the Redis window `key` and returns the window's count.
+        """
+        count = await self.safe_execute('incr', key)
+        if count == 1:
+            await self.safe_execute('expire', key, self.window_ms // 1000)
+        return count
+
+    async def check(self, scope: Optional[str] = None):
+        """
+        Counts one request against the limit, raising once it is exceeded.
+        An optional `scope` (e.g. a client IP or user id) gives that caller its own Redis window;
+        the in-memory fallback is per-process and ignores it.
+        """
         if self.redis_client:
-            now = int(time.time() * 1000)
-            window = now // self.window_ms
-            key = f"rate_limiter:{id(self)}:{window}"
+            # Window keys are shared across processes, so they stay on the wall clock.
+            now = time.time_ns() // 1_000_000
+            key = self._window_key(scope, now // self.window_ms)
             try:
-                count = await self.safe_execute('incr', key)
-                if count == 1:
-                    await self.safe_execute('expire', key, self.window_ms // 1000)
+                count = await self._redis_count(key)
                 if count > self.max_requests:
                     logger.warning("Rate limit exceeded (distributed).", extra={"key": key, "count": count})
                     raise Exception("Rate limit exceeded. Please try again later.")
@@ -75,16 +141,55 @@ class RateLimiter:
                     logger.exception("Error in distributed rate limiter, falling back to in-memory.")
                 else:
                     logger.error("Error in distributed rate limiter, falling back to in-memory.", extra={"error": str(e)})
-                self._in_memory_check(now)
+                self._in_memory_check()
         else:
-            self._in_memory_check(int(time.time() * 1000))
-
-    def _in_memory_check(self, now: int):
-        # Remove requests older than windowMs
-        while self.queue and (now - self.queue[0] > self.window_ms):
-            self.queue.pop(0)
-        if len(self.queue) >= self.max_requests:
-            logger.warning("Rate limit exceeded (in-memory).", extra={"currentQueueLength": len(self.queue)})
+            self._in_memory_check()
+
+    async def acquire(self, scope: Optional[str] = None):
+        """
+        Like check, but once the limit is reached it waits until the request fits in the
+        window instead of raising. For callers that would rather be slowed down than fail.
+        """
+        while self.redis_client:
+            now = time.time_ns() // 1_000_000
+            window = now // self.window_ms
+            key = self._window_key(scope, window)
+            try:
+                count = await self._redis_count(key)
+            except Exception as e:
+                if config.enable_debug:
+                    logger.exception("Error in distributed rate limiter, falling back to in-memory.")
+                else:
+                    logger.error("Error in distributed rate limiter, falling back to in-memory.", extra={"error": str(e)})
+                break
+            if count <= self.max_requests:
+                return
+            # The window is full: sleep until the next one starts
+            logger.debug("Rate limit reached (distributed), waiting for the next window.", extra={"key": key, "count": count})
+            await asyncio.sleep(((window + 1) * self.window_ms - now) / 1000)
+
+        # Waiters are served in arrival order, one timer at a time, instead of all of them
+        # waking up together and racing for the same token
+        async with self._acquire_lock:
+            self._refill()
+            while self.tokens < 1.0:
+                # Sleep only until the next token has been refilled
+                logger.debug("Rate limit reached (in-memory), waiting.", extra={"tokens": self.tokens})
+                await asyncio.sleep((1.0 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1.0
+
+    def _refill(self):
+        # Monotonic clock, so wall-clock jumps cannot corrupt the bucket.
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _in_memory_check(self):
+        self._refill()
+        if self.tokens < 1.0:
+            logger.warning("Rate limit exceeded (in-memory).", extra={"tokens": self.tokens})
             raise Exception("Rate limit exceeded. Please try again later.")
-        self.queue.append(now)
-        logger.debug("RateLimiter check passed (in-memory).", extra={"newQueueLength": len(self.queue)})
+        self.tokens -= 1.0
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("RateLimiter check passed (in-memory).", extra={"tokens": self.tokens})
@@ -1,12 +1,14 @@
 import time
-import json
-import traceback
+import hashlib
+import logging
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import List, Dict, Any, Optional
 import os
 
-from fastapi.concurrency import run_in_threadpool
-
+import orjson
 from twitter.account import Account
 from twitter.scraper import Scraper
 from twitter.search import Search
@@ -16,244 +18,344 @@ from ..types import Tweet, QueryTweetsResponse, SearchMode
 from ..utils import logger
 from .rate_limiter import RateLimiter
 
+# Dedicated pool for the synchronous twitter-api-client calls, kept apart from
+# FastAPI's shared threadpool so heavy Twitter traffic cannot block other endpoints.
+_twitter_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="twitter")
+
+# Response cache TTLs (seconds) for the Redis-backed Twitter read cache.
+_USER_TWEETS_CACHE_TTL = 60
+_TIMELINE_CACHE_TTL = 15
+_SEARCH_CACHE_TTL = 60
+
+# Working directory and logging config handed to twitter-api-client's Search.
+_SEARCH_OUTPUT_DIR = "/tmp/twitter_search"
+_SEARCH_LOG_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "level": "DEBUG"
+        }
+    },
+    "root": {
+        "handlers": ["console"],
+        "level": "DEBUG"
+    }
+}
+
+# Seconds a successful login probe is trusted before the session is re-verified.
+_LOGIN_CHECK_TTL = 300
+
+# SearchMode value -> twitter-api-client search category, built once at import.
+_CATEGORY_MAP = MappingProxyType({
+    SearchMode.Latest.value: "Latest",
+    SearchMode.Top.value: "Top",
+    SearchMode.People.value: "People",
+    SearchMode.Photos.value: "Photos",
+    SearchMode.Videos.value: "Videos"
+})
+
+# Timeline entry content types that can carry tweets (substring match on entryType/__typename).
+_ALLOWED_CONTENT_TYPES = ("TimelineTimelineItem", "TimelineTimelineModule", "VerticalConversation")
+
+# Operation key under a GraphQL response's "data" -> path to its timeline instructions.
+_INSTRUCTION_PATHS = MappingProxyType({
+    "home": ("home", "home_timeline_urt", "instructions"),
+    "search_by_raw_query": ("search_by_raw_query", "search_timeline", "timeline", "instructions"),
+    "user": ("user", "result", "timeline_v2", "timeline", "instructions"),
+    "threaded_conversation_with_injections_v2": ("threaded_conversation_with_injections_v2", "instructions")
+})
+
+def _fast_extract(entry: dict) -> Optional[dict]:
+    """
+    Straight-line extractor for the common TimelineTimelineItem shape
+    (content.itemContent.tweet_results.result holding a plain Tweet).
+    Returns None for anything else so the caller can take the generic path.
+    """
+    try:
+        result = entry["content"]["itemContent"]["tweet_results"]["result"]
+    except (KeyError, TypeError):
+        return None
+    if type(result) is dict and "legacy" in result:
+        return result
+    return None
+
+async def _run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking twitter-api-client call, or a CPU-heavy payload parse,
+    on the dedicated Twitter pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_twitter_pool, functools.partial(func, *args, **kwargs))
+
 class TwitterClientManager:
     def __init__(self):
         self._account = None
         self._scraper = None
         self._search = None
         self._logged_in = False
+        self._logged_in_at = 0.0
         self._cookies_store = None
+        # Serializes login probes, so concurrent requests share one probe
+        self._login_lock = asyncio.Lock()
+        self._login_probes = 0
+
+    def _build(self, cls, **extra):
+        """
+        Creates a twitter-api-client object (Account, Scraper or Search) from the stored
+        cookies when there are any, and from the account credentials otherwise.
+        """
+        if self._cookies_store:
+            source = "cookies store"
+            credentials = {"cookies": self._cookies_store}
+        else:
+            source = "fallback user/pass"
+            credentials = {
+                "email": config.twitter_email,
+                "username": config.twitter_username,
+                "password": config.twitter_password
+            }
+        try:
+            instance = cls(**credentials, **extra)
+        except Exception as e:
+            logger.error(f"Exception creating {cls.__name__} with {source}", exc_info=True, extra={"error": str(e)})
+            raise
+        logger.info(f"{cls.__name__} instance created from {source}.")
+        return instance
 
     def _init_account(self) -> Account:
-        logger.debug("Entering _init_account to set up Account instance...")
-        try:
+        if config.twitter_cookies:
+            logger.info("Using cookies parsed from TWITTER_COOKIES_JSON...")
+            # twitter-api-client only accepts a real dict; this one copy is shared
+            # by the Account, Scraper and Search builders.
+            self._cookies_store = dict(config.twitter_cookies)
+        else:
             if config.twitter_cookies_json:
-                logger.info("Loading cookies from JSON in env...")
-                try:
-                    cookies_dict = json.loads(config.twitter_cookies_json)
-                    self._cookies_store = cookies_dict
-                    acct = Account(cookies=cookies_dict)
-                    logger.debug("Successfully created Account from inline JSON cookies.")
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    logger.error(
-                        "Failed to parse TWITTER_COOKIES_JSON; falling back to username/password",
-                        extra={"error": str(e), "traceback": tb}
-                    )
-                    self._cookies_store = None
-                    acct = Account(
-                        email=config.twitter_email,
-                        username=config.twitter_username,
-                        password=config.twitter_password
-                    )
+                logger.error("Failed to parse TWITTER_COOKIES_JSON; falling back to username/password")
             else:
                 logger.warning("No cookies provided. Falling back to username/password approach (less stable).")
-                acct = Account(
-                    email=config.twitter_email,
-                    username=config.twitter_username,
-                    password=config.twitter_password
-                )
-        except Exception as ex:
-            tb = traceback.format_exc()
-            logger.error(
-                "Exception occurred while initializing Account object.",
-                extra={"error": str(ex), "traceback": tb}
-            )
-            raise
-
-        logger.debug("Leaving _init_account.")
-        return acct
+            self._cookies_store = None
+        return self._build(Account)
 
     def get_account(self) -> Account:
         if not self._account:
-            logger.debug("No existing Account found; calling _init_account now.")
             self._account = self._init_account()
-            logger.info("Account instance created.")
-        else:
-            logger.debug("Reusing existing Account instance.")
         return self._account
 
     def get_scraper(self) -> Scraper:
         if not self._scraper:
-            logger.debug("No existing Scraper; about to retrieve account/cookies for the Scraper.")
-            self.get_account()
-            if self._cookies_store:
-                logger.debug("Detected cookies store; creating Scraper with it now.")
-                try:
-                    self._scraper = Scraper(cookies=self._cookies_store)
-                    logger.info("Scraper instance created from cookies store.")
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    logger.error("Exception creating Scraper with stored cookies", extra={"error": str(e), "traceback": tb})
-                    raise
-            else:
-                logger.warning("No cookies store found. Attempting Scraper with fallback credentials.")
-                try:
-                    self._scraper = Scraper(
-                        email=config.twitter_email,
-                        username=config.twitter_username,
-                        password=config.twitter_password
-                    )
-                    logger.debug("Scraper created using fallback user/pass.")
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    logger.error("Exception creating Scraper with user/pass fallback", extra={"error": str(e), "traceback": tb})
-                    raise
-        else:
-            logger.debug("Reusing existing Scraper instance.")
+            self.get_account()  # decides between cookies and credentials
+            self._scraper = self._build(Scraper)
         return self._scraper
 
     def get_search(self) -> Search:
         if not self._search:
-            logger.debug("No existing Search instance; creating a new one.")
-            logger.info("Creating Search instance for advanced queries.")
-            self.get_account()
-
-            output_dir = "/tmp/twitter_search"
-            os.makedirs(output_dir, exist_ok=True)
-
-            console_only_logger = {
-                "version": 1,
-                "disable_existing_loggers": False,
-                "handlers": {
-                    "console": {
-                        "class": "logging.StreamHandler",
-                        "level": "DEBUG"
-                    }
-                },
-                "root": {
-                    "handlers": ["console"],
-                    "level": "DEBUG"
-                }
-            }
-
-            if self._cookies_store:
-                logger.debug("Detected cookies store; creating Search with cookies.")
-                try:
-                    self._search = Search(
-                        cookies=self._cookies_store,
-                        save=False,
-                        debug=False,
-                        output_dir=output_dir,
-                        data_dir=output_dir,
-                        cfg=console_only_logger
-                    )
-                    logger.info("Search instance created from cookies store.")
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    logger.error("Exception creating Search with stored cookies", extra={"error": str(e), "traceback": tb})
-                    raise
-            else:
-                logger.warning("No cookies store found. Attempting Search fallback approach with user/pass.")
-                try:
-                    self._search = Search(
-                        email=config.twitter_email,
-                        username=config.twitter_username,
-                        password=config.twitter_password,
-                        save=False,
-                        debug=False,
-                        output_dir=output_dir,
-                        data_dir=output_dir,
-                        cfg=console_only_logger
-                    )
-                    logger.debug("Search created with fallback user/pass.")
-                except Exception as e:
-                    tb = traceback.format_exc()
-                    logger.error("Exception creating Search with user/pass fallback", extra={"error": str(e), "traceback": tb})
-                    raise
-        else:
-            logger.debug("Reusing existing Search instance.")
+            self.get_account()  # decides between cookies and credentials
+            os.makedirs(_SEARCH_OUTPUT_DIR, exist_ok=True)
+            self._search = self._build(
+                Search,
+                save=False,
+                debug=False,
+                output_dir=_SEARCH_OUTPUT_DIR,
+                data_dir=_SEARCH_OUTPUT_DIR,
+                cfg=_SEARCH_LOG_CONFIG
+            )
         return self._search
 
-    def is_logged_in(self) -> bool:
-        logger.debug("Checking if we are logged in via home_timeline call.")
-        if not self._logged_in:
-            try:
-                logger.debug("Calling home_timeline(limit=1) to verify login status.")
-                self.get_account().home_timeline(limit=1)
-                logger.debug("home_timeline succeeded; marking _logged_in = True.")
-                self._logged_in = True
-            except Exception as e:
-                tb = traceback.format_exc()
-                logger.error("Login check failed", extra={"error": str(e), "traceback": tb})
-                self._logged_in = False
-        else:
+    async def is_logged_in(self) -> bool:
+        """
+        Verifies the session with a home_timeline(limit=1) probe on the Twitter pool.
+        A successful probe is trusted for _LOGIN_CHECK_TTL seconds, after which the
+        session is re-verified so an expired cookie set is noticed. Requests arriving
+        while a probe runs wait for its outcome instead of probing again.
+        """
+        if self._logged_in and time.monotonic() - self._logged_in_at <= _LOGIN_CHECK_TTL:
             logger.debug("Already marked as logged in (self._logged_in == True).")
+            return True
+
+        probes = self._login_probes
+        async with self._login_lock:
+            # A probe finished while this request waited; its outcome (success or failure)
+            # is as fresh as a new one would be
+            if self._login_probes != probes:
+                return self._logged_in
+            return await self._probe_login()
+
+    async def _probe_login(self) -> bool:
+        try:
+            logger.debug("Calling home_timeline(limit=1) to verify login status.")
+            account = await _run_blocking(self.get_account)
+            await _run_blocking(account.home_timeline, limit=1)
+            logger.debug("home_timeline succeeded; marking _logged_in = True.")
+            self._logged_in = True
+            self._logged_in_at = time.monotonic()
+        except Exception as e:
+            # Repeats on every request while the session is bad; the traceback is only
+            # worth formatting when debugging
+            if config.enable_debug:
+                logger.exception("Login check failed")
+            else:
+                logger.error("Login check failed", extra={"error": str(e)})
+            self._logged_in = False
+        self._login_probes += 1
         return self._logged_in
 
 twitter_client_manager = TwitterClientManager()
 
 class TwitterService:
     def __init__(self):
-        self.rate_limiter = RateLimiter(15, 60_000)
+        self.rate_limiter = RateLimiter(15, 60_000, name="twitter")
+        # Shape tag (see _item_kind) -> handler returning the tweet dicts held by that item.
+        self._flat_handlers = {
+            "entry": self._extract_from_entry,
+            "tweets": lambda it: it["tweets"],
+            "instructions": self._extract_from_new_instructions,
+            "entries": lambda it: self._extract_from_entries(it["entries"]),
+            "list": self._iter_flat,
+            "deep": self._extract_tweets_deep
+        }
 
     async def _ensure_login(self):
         logger.debug("_ensure_login called. Checking is_logged_in() on twitter_client_manager.")
-        if not twitter_client_manager.is_logged_in():
+        if not await twitter_client_manager.is_logged_in():
             logger.debug("twitter_client_manager reports not logged in. Raising RuntimeError.")
             raise RuntimeError("Not logged into Twitter. Check your cookies or credentials.")
         logger.debug("twitter_client_manager is logged in successfully.")
 
+    async def _cache_get_or_set(self, key: str, ttl: int, producer) -> List[Tweet]:
+        """
+        Returns the tweets cached in Redis under `key`, or awaits `producer()`,
+        caches its result for `ttl` seconds and returns it. Empty results are not cached,
+        so a transient empty response does not hide real results for the whole TTL.
+        Without Redis (or on Redis errors) the producer is simply called.
+        """
+        if self.rate_limiter.redis_client:
+            try:
+                cached = await self.rate_limiter.safe_execute('get', key)
+            except Exception as e:
+                if config.enable_debug:
+                    logger.exception("Redis error in Twitter caching get")
+                else:
+                    logger.error("Redis error in Twitter caching get", extra={"error": str(e)})
+                cached = None
+            if cached:
+                logger.debug("Returning cached Twitter result", extra={"key": key})
+                return [Tweet(**item) for item in orjson.loads(cached)]
+
+        tweets = await producer()
+
+        if tweets and self.rate_limiter.redis_client:
+            try:
+                await self.rate_limiter.safe_execute('set', key, orjson.dumps([t.dict() for t in tweets]), ex=ttl)
+            except Exception as e:
+                if config.enable_debug:
+                    logger.exception("Redis error in Twitter caching set")
+                else:
+                    logger.error("Redis error in Twitter caching set", extra={"error": str(e)})
+        return tweets
+
+    async def _invalidate_tweet_cache(self):
+        """
+        Drops cached home/following timelines and user tweets after a mutation (tweet, reply,
+        quote, retweet, like), so the next read reflects the change instead of serving a stale list.
+        """
+        if not self.rate_limiter.redis_client:
+            return
+        try:
+            for pattern in ("twitter:home:*", "twitter:following:*", "twitter:user:*"):
+                cursor = 0
+                while True:
+                    cursor, keys = await self.rate_limiter.safe_execute('scan', cursor, match=pattern, count=100)
+                    if keys:
+                        await self.rate_limiter.safe_execute('delete', *keys)
+                    if not cursor:
+                        break
+        except Exception as e:
+            logger.error("Redis error invalidating Twitter tweet cache", extra={"error": str(e)})
+
     def get_profile(self):
         return {"username": getattr(config, "twitter_username", "unknown"), "id": "0"}
 
     async def get_user_tweets(self, user_id: str, count: int) -> List[Tweet]:
         logger.debug("Service: get_user_tweets invoked", extra={"user_id": user_id, "count": count})
+        return await self._cache_get_or_set(
+            f"twitter:user:{user_id}:{count}",
+            _USER_TWEETS_CACHE_TTL,
+            lambda: self._get_user_tweets_uncached(user_id, count)
+        )
+
+    async def _get_user_tweets_uncached(self, user_id: str, count: int) -> List[Tweet]:
         await self.rate_limiter.check()
         await self._ensure_login()
 
         scraper = twitter_client_manager.get_scraper()
         numeric_id = int(user_id)
-        raw_tweets = scraper.tweets([numeric_id], limit=count)
-        return self._parse_tweets(raw_tweets)
+        raw_tweets = await _run_blocking(scraper.tweets, [numeric_id], limit=count)
+        return await _run_blocking(self._parse_tweets, raw_tweets)
 
     async def fetch_home_timeline(self, count: int) -> List[Tweet]:
         logger.debug("Service: fetch_home_timeline invoked", extra={"count": count})
+        return await self._cache_get_or_set(
+            f"twitter:home:{count}",
+            _TIMELINE_CACHE_TTL,
+            lambda: self._fetch_home_timeline_uncached(count)
+        )
+
+    async def _fetch_home_timeline_uncached(self, count: int) -> List[Tweet]:
         await self.rate_limiter.check()
         await self._ensure_login()
 
         account = twitter_client_manager.get_account()
-        timeline_data = account.home_timeline(limit=count) or []
+        timeline_data = await _run_blocking(account.home_timeline, limit=count) or []
         if config.enable_debug:
             try:
                 logger.debug("Raw home_timeline data:\n%s",
-                             json.dumps(timeline_data, ensure_ascii=False, indent=2))
+                             orjson.dumps(timeline_data, option=orjson.OPT_INDENT_2).decode())
             except Exception:
                 logger.debug("Raw home_timeline data (repr): %r", timeline_data)
 
-        return self._parse_account_timeline(timeline_data)
+        return await _run_blocking(self._parse_account_timeline, timeline_data)
 
     async def fetch_following_timeline(self, count: int) -> List[Tweet]:
         logger.debug("Service: fetch_following_timeline invoked", extra={"count": count})
+        return await self._cache_get_or_set(
+            f"twitter:following:{count}",
+            _TIMELINE_CACHE_TTL,
+            lambda: self._fetch_following_timeline_uncached(count)
+        )
+
+    async def _fetch_following_timeline_uncached(self, count: int) -> List[Tweet]:
         await self.rate_limiter.check()
         await self._ensure_login()
 
         account = twitter_client_manager.get_account()
-        timeline_data = account.home_latest_timeline(limit=count) or []
+        timeline_data = await _run_blocking(account.home_latest_timeline, limit=count) or []
         if config.enable_debug:
             try:
                 logger.debug("Raw home_latest_timeline data:\n%s",
-                             json.dumps(timeline_data, ensure_ascii=False, indent=2))
+                             orjson.dumps(timeline_data, option=orjson.OPT_INDENT_2).decode())
             except Exception:
                 logger.debug("Raw home_latest_timeline data (repr): %r", timeline_data)
 
-        return self._parse_account_timeline(timeline_data)
+        return await _run_blocking(self._parse_account_timeline, timeline_data)
 
     async def fetch_search_tweets(self, query: str, max_tweets: int, mode: str) -> QueryTweetsResponse:
         logger.debug("Service: fetch_search_tweets called", extra={"query": query, "max_tweets": max_tweets, "mode": mode})
+        query_hash = hashlib.sha1(query.encode("utf-8")).hexdigest()
+        tweets = await self._cache_get_or_set(
+            f"twitter:search:{mode}:{max_tweets}:{query_hash}",
+            _SEARCH_CACHE_TTL,
+            lambda: self._fetch_search_tweets_uncached(query, max_tweets, mode)
+        )
+        return QueryTweetsResponse(tweets=tweets)
+
+    async def _fetch_search_tweets_uncached(self, query: str, max_tweets: int, mode: str) -> List[Tweet]:
         await self.rate_limiter.check()
         await self._ensure_login()
 
         search_client = twitter_client_manager.get_search()
-
-        category_map = {
-            SearchMode.Latest.value: "Latest",
-            SearchMode.Top.value: "Top",
-            SearchMode.People.value: "People",
-            SearchMode.Photos.value: "Photos",
-            SearchMode.Videos.value: "Videos"
-        }
-        category = category_map.get(mode, "Top")
+        category = _CATEGORY_MAP.get(mode, "Top")
 
         queries = [{"category": category, "query": query}]
 
@@ -268,7 +370,7 @@ class TwitterService:
             previous_cwd = os.getcwd()
             os.chdir(scratch_dir)
             try:
-                results = await run_in_threadpool(
+                results = await _run_blocking(
                     search_client.run,
                     queries=queries,
                     limit=max_tweets,
@@ -278,33 +380,27 @@ class TwitterService:
             finally:
                 os.chdir(previous_cwd)
 
-            logger.debug("search_client.run() returned", extra={
-                "type": str(type(results)),
-                "full_results_str": str(results),
-                "count": len(results) if isinstance(results, list) else "N/A"
-            })
+            if logger.isEnabledFor(logging.DEBUG):
+                # str(results) can be tens of KB; only build it when debug output is on.
+                logger.debug("search_client.run() returned", extra={
+                    "type": str(type(results)),
+                    "full_results_str": str(results) if config.enable_debug else repr(results)[:512],
+                    "count": len(results) if isinstance(results, list) else "N/A"
+                })
 
         except TypeError as te:
             logger.warning("Twitter search returned None; treating as empty result set", extra={"error": str(te)})
             results = []
         except Exception as exc:
-            tb = traceback.format_exc()
             logger.error("Failed to execute search_client.run()", exc_info=True,
-                         extra={"error": str(exc), "traceback": tb})
+                         extra={"error": str(exc)})
             raise
 
         if not results:
             logger.debug("search_client.run() returned empty or None results. Returning empty list.")
-            return QueryTweetsResponse(tweets=[])
-
-        all_tweets_data = self._flatten_search_results(results)
-        found = []
-        for tweet_dict in all_tweets_data:
-            parsed = self._map_tweet_item(tweet_dict)
-            if parsed:
-                found.append(parsed)
+            return []
 
-        return QueryTweetsResponse(tweets=found)
+        return await _run_blocking(self._parse_account_timeline, results)
 
     async def fetch_mentions(self) -> QueryTweetsResponse:
         profile = self.get_profile()
@@ -313,8 +409,9 @@ class TwitterService:
             logger.warning("fetchMentions: Twitter not logged in.")
             return QueryTweetsResponse(tweets=[])
         count = 10
-        search_results = await self.fetch_search_tweets(f"@{username}", count, SearchMode.Latest.value)
-        return search_results
+        # Not read through the search cache, so new mentions show up immediately
+        tweets = await self._fetch_search_tweets_uncached(f"@{username}", count, SearchMode.Latest.value)
+        return QueryTweetsResponse(tweets=tweets)
 
     async def post_tweet(self, text: str, in_reply_to_id: str = None) -> Optional[str]:
         logger.debug("Service: post_tweet called", extra={"text": text, "inReplyToId": in_reply_to_id})
@@ -324,9 +421,10 @@ class TwitterService:
         account = twitter_client_manager.get_account()
         try:
             if in_reply_to_id:
-                posted_id = account.reply(text, tweet_id=int(in_reply_to_id))
+                posted_id = await _run_blocking(account.reply, text, tweet_id=int(in_reply_to_id))
             else:
-                posted_id = account.tweet(text)
+                posted_id = await _run_blocking(account.tweet, text)
+            await self._invalidate_tweet_cache()
             return str(posted_id)
         except Exception as e:
             logger.error("Failed to post tweet",
@@ -341,7 +439,8 @@ class TwitterService:
 
         account = twitter_client_manager.get_account()
         try:
-            posted_id = account.quote(text, tweet_id=int(quote_id))
+            posted_id = await _run_blocking(account.quote, text, tweet_id=int(quote_id))
+            await self._invalidate_tweet_cache()
             return str(posted_id)
         except Exception as e:
             logger.error("Failed to quote tweet",
@@ -356,7 +455,8 @@ class TwitterService:
 
         account = twitter_client_manager.get_account()
         try:
-            account.retweet(int(tweet_id))
+            await _run_blocking(account.retweet, int(tweet_id))
+            await self._invalidate_tweet_cache()
             return True
         except Exception as e:
             logger.error("Failed to retweet",
@@ -371,7 +471,8 @@ class TwitterService:
 
         account = twitter_client_manager.get_account()
         try:
-            account.like(int(tweet_id))
+            await _run_blocking(account.like, int(tweet_id))
+            await self._invalidate_tweet_cache()
             return True
         except Exception as e:
             logger.error("Failed to like tweet",
@@ -387,97 +488,98 @@ class TwitterService:
         if not raw_items:
             return tweets
 
+        now_s = time.time_ns() // 1_000_000_000
+        map_item = self._map_tweet_item
+        append = tweets.append
         for item in raw_items:
-            mapped = self._map_tweet_item(item)
+            mapped = map_item(item, now_s)
             if mapped:
-                tweets.append(mapped)
+                append(mapped)
         return tweets
 
     def _parse_account_timeline(self, timeline_data) -> List[Tweet]:
         logger.debug("_parse_account_timeline called.", extra={
             "timeline_items_count": len(timeline_data) if timeline_data else 0
         })
-        flattened = self._flatten_search_results(timeline_data)
-        logger.debug(f"Flattened timeline items => {len(flattened)} potential tweets.")
         tweets = []
-        for item in flattened:
-            mapped = self._map_tweet_item(item)
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        now_s = time.time_ns() // 1_000_000_000
+        map_item = self._map_tweet_item
+        append = tweets.append
+        for item in self._iter_flat(timeline_data):
+            mapped = map_item(item, now_s)
             if mapped:
-                tweets.append(mapped)
-            else:
-                if config.enable_debug:
-                    logger.debug("map_tweet_item returned None for item:\n%r", item)
+                append(mapped)
+            elif debug_enabled:
+                logger.debug("map_tweet_item returned None for item:\n%r", item)
         return tweets
 
-    def _map_tweet_item(self, data: dict) -> Optional[Tweet]:
+    def _map_tweet_item(self, data: dict, now_s: Optional[int] = None) -> Optional[Tweet]:
+        """
+        Maps a raw tweet dict to a Tweet. `now_s` is the batch timestamp computed once
+        by the caller; it is only read from the clock here when not provided.
+        """
+        dbg = config.enable_debug
         try:
-            if "tweet_results" in data and isinstance(data["tweet_results"], dict):
-                data = data["tweet_results"].get("result", data)
-
-            tid = str(
-                data.get("rest_id")
-                or data.get("id")
-                or data.get("id_str")
-                or "0"
-            )
+            tweet_results = data.get("tweet_results")
+            if isinstance(tweet_results, dict):
+                data = tweet_results.get("result", data)
 
-            text = ""
-            uname = "unknown"
-            user_id_str = "0"
-            conv_id = "0"
-            q_count = 0
-            r_count = 0
-            rt_count = 0
-
-            if "legacy" in data:
-                legacy = data["legacy"]
-                raw_text = legacy.get("full_text") or legacy.get("text", "")
-                if not raw_text and "note_tweet" in data:
-                    raw_text = self._extract_note_tweet_text(data["note_tweet"])
-                text = raw_text
-                conv_id = str(legacy.get("conversation_id_str") or "0")
+            tid = str(data.get("rest_id") or data.get("id") or data.get("id_str") or "0")
 
-                q_count = int(legacy.get("quote_count", 0))
-                r_count = int(legacy.get("reply_count", 0))
-                rt_count = int(legacy.get("retweet_count", 0))
+            legacy = data.get("legacy")
+            if legacy is not None:
+                text = legacy.get("full_text") or legacy.get("text", "")
+                if not text and "note_tweet" in data:
+                    text = self._extract_note_tweet_text(data["note_tweet"])
+                conv_id = str(legacy.get("conversation_id_str") or "0")
+                q_count, r_count, rt_count = (
+                    int(legacy.get("quote_count") or 0),
+                    int(legacy.get("reply_count") or 0),
+                    int(legacy.get("retweet_count") or 0)
+                )
 
-                core_user = data.get("core", {}).get("user_results", {}).get("result", {})
+                # Walk core.user_results.result without allocating empty dicts on every miss.
+                core = data.get("core")
+                user_res = core.get("user_results") if core else None
+                core_user = user_res.get("result", {}) if user_res else {}
                 if isinstance(core_user, dict):
                     user_id_str = str(core_user.get("rest_id") or "0")
-                    if "legacy" in core_user:
-                        uname = core_user["legacy"].get("screen_name", "unknown")
+                    user_legacy = core_user.get("legacy")
+                    uname = user_legacy.get("screen_name", "unknown") if user_legacy is not None else "unknown"
                 else:
+                    user_id_str = "0"
                     uname = data.get("username") or data.get("user_screen_name") or "unknown"
             else:
-                raw_text = data.get("text", "")
-                if not raw_text and "note_tweet" in data:
-                    raw_text = self._extract_note_tweet_text(data["note_tweet"])
-                text = raw_text
+                text = data.get("text", "")
+                if not text and "note_tweet" in data:
+                    text = self._extract_note_tweet_text(data["note_tweet"])
                 uname = data.get("username") or data.get("user_screen_name") or "unknown"
                 user_id_str = str(data.get("user_id") or "0")
                 conv_id = str(data.get("conversation_id") or "0")
-                q_count = int(data.get("quote_count", 0))
-                r_count = int(data.get("reply_count", 0))
-                rt_count = int(data.get("retweet_count", 0))
+                q_count, r_count, rt_count = (
+                    int(data.get("quote_count") or 0),
+                    int(data.get("reply_count") or 0),
+                    int(data.get("retweet_count") or 0)
+                )
 
-            timestamp_s = int(time.time())
             tweet = Tweet(
                 id=tid,
                 userId=user_id_str,
                 username=uname,
                 text=text,
                 conversationId=conv_id,
-                timestamp=timestamp_s,
+                timestamp=now_s if now_s is not None else time.time_ns() // 1_000_000_000,
                 permanentUrl=f"https://x.com/{uname}/status/{tid}",
                 quoteCount=q_count,
                 replyCount=r_count,
                 retweetCount=rt_count
             )
 
-            if config.enable_debug:
+            if dbg:
                 logger.debug(
-                    f"Mapped tweet ID={tid}, user={uname}, textLen={len(text)}, "
-                    f"replyCount={r_count}, retweetCount={rt_count}, quoteCount={q_count}"
+                    "Mapped tweet ID=%s, user=%s, textLen=%d, replyCount=%d, retweetCount=%d, quoteCount=%d",
+                    tid, uname, len(text), r_count, rt_count, q_count
                 )
             return tweet
 
@@ -502,47 +604,196 @@ class TwitterService:
             logger.debug("Could not extract note_tweet text", extra={"error": str(ex), "raw": note_tweet_block})
         return ""
 
-    def _flatten_search_results(self, results):
+    @staticmethod
+    def _item_kind(item) -> Optional[str]:
+        """
+        Classifies a top-level payload item once, so _iter_flat can dispatch
+        straight to its handler instead of re-running the same checks.
+        Dicts of an unknown shape fall back to the generic deep walk.
+        """
+        t = type(item)
+        if t is dict:
+            if "entryId" in item:
+                return "entry" if "content" in item else None
+            if type(item.get("tweets")) is list:
+                return "tweets"
+            if "data" in item or "instructions" in item:
+                return "instructions"
+            if type(item.get("entries")) is list:
+                return "entries"
+            return "deep"
+        if t is list:
+            return "list"
+        return None
+
+    def _iter_flat(self, results):
+        """
+        Yields the raw tweet dicts contained in a search/timeline payload one at a time,
+        so callers can map them in a single pass without an intermediate flattened list.
+        """
         if isinstance(results, str):
-            logger.debug("_flatten_search_results received a string. Attempting to parse JSON.")
+            logger.debug("_iter_flat received a string. Attempting to parse JSON.")
             try:
-                results = json.loads(results)
+                results = orjson.loads(results)
                 logger.debug("Successfully parsed the string into JSON. Proceeding.")
             except Exception as ex:
                 logger.error("Could not parse timeline string as JSON", extra={"error": str(ex)})
-                return []
+                return
 
         if not isinstance(results, list):
-            logger.debug("_flatten_search_results: Non-list results -> returning empty.")
-            return []
-
-        flattened_tweets = []
+            logger.debug("_iter_flat: Non-list results -> nothing to yield.")
+            return
 
+        handlers = self._flat_handlers
+        item_kind = self._item_kind
+        dbg = config.enable_debug
         for idx, item in enumerate(results):
-            if (
-                isinstance(item, dict)
-                and isinstance(item.get("entryId"), str)
-                and item["entryId"].startswith("tweet-")
-                and "content" in item
-            ):
-                single_extracts = self._extract_from_entry(item)
-                if single_extracts:
-                    flattened_tweets.extend(single_extracts)
-                    continue
-
-            if isinstance(item, dict) and "tweets" in item and isinstance(item["tweets"], list):
-                extracted_count = len(item["tweets"])
-                if config.enable_debug:
-                    logger.debug(f"_flatten_search_results: Found {extracted_count} tweets in item index={idx}.")
-                flattened_tweets.extend(item["tweets"])
+            kind = item_kind(item)
+            if kind is None:
                 continue
+            extracted = handlers[kind](item)
+            if dbg and kind == "tweets":
+                logger.debug("_iter_flat: Found %d tweets in item index=%d.", len(extracted), idx)
+            yield from extracted
+
+    @staticmethod
+    def _unwrap_tweet_result(result) -> Optional[dict]:
+        """
+        Returns the tweet dict from a tweet_results.result block, unwrapping
+        TweetWithVisibilityResults; None for tombstones and unavailable tweets.
+        """
+        if not isinstance(result, dict):
+            return None
+        if result.get("__typename") == "TweetWithVisibilityResults":
+            result = result.get("tweet")
+            if not isinstance(result, dict):
+                return None
+        if "legacy" not in result:
+            return None
+        return result
+
+    def _extract_from_entry(self, entry: dict) -> List[dict]:
+        """
+        Extracts the tweet dicts from a single timeline entry:
+        a TimelineTimelineItem (one tweet) or a TimelineTimelineModule (conversation thread).
+        """
+        tweet = _fast_extract(entry)
+        if tweet is not None:
+            return [tweet]
+
+        content = entry.get("content")
+        if not isinstance(content, dict):
+            return []
+        # Cursors and other non-tweet entries are rejected on their type tag alone.
+        content_type = content.get("entryType") or content.get("__typename")
+        if content_type and not any(a in content_type for a in _ALLOWED_CONTENT_TYPES):
+            return []
 
-            # Additional parsing omitted for brevity...
+        item_content = content.get("itemContent")
+        if isinstance(item_content, dict):
+            tweet_results = item_content.get("tweet_results")
+            if isinstance(tweet_results, dict):
+                tweet = self._unwrap_tweet_result(tweet_results.get("result"))
+                if tweet is not None:
+                    return [tweet]
+            return []
 
-        if config.enable_debug:
-            logger.debug(f"_flatten_search_results: total flattened tweets={len(flattened_tweets)}")
-        return flattened_tweets
+        module_items = content.get("items")
+        if isinstance(module_items, list):
+            tweets = []
+            for module_item in module_items:
+                inner = module_item.get("item") if isinstance(module_item, dict) else None
+                inner_content = inner.get("itemContent") if isinstance(inner, dict) else None
+                tweet_results = inner_content.get("tweet_results") if isinstance(inner_content, dict) else None
+                if isinstance(tweet_results, dict):
+                    tweet = self._unwrap_tweet_result(tweet_results.get("result"))
+                    if tweet is not None:
+                        tweets.append(tweet)
+            return tweets
+
+        return []
+
+    def _extract_tweets_deep(self, node) -> List[dict]:
+        """
+        Generic fallback: collects every tweet_results.result found anywhere under `node`,
+        in document order, without descending into the tweets it has already collected.
+        Walks an explicit stack instead of recursing, so deeply nested conversations cost
+        no Python frames and cannot hit the recursion limit.
+        Payloads are plain orjson/json output, so exact `type(...) is` checks are safe.
+        """
+        found = []
+        append = found.append
+        unwrap = self._unwrap_tweet_result
+        stack = [node]
+        pop = stack.pop
+        push_all = stack.extend
+        while stack:
+            n = pop()
+            t = type(n)
+            if t is dict:
+                tr = n.get("tweet_results")
+                if type(tr) is dict:
+                    tweet = unwrap(tr.get("result"))
+                    if tweet is not None:
+                        append(tweet)
+                    # A tweet result is the bulk of the payload and holds no further
+                    # tweet_results, so only its siblings are walked.
+                    push_all(reversed([v for k, v in n.items() if k != "tweet_results"]))
+                else:
+                    push_all(reversed(n.values()))
+            elif t is list:
+                push_all(reversed(n))
+        return found
+
+    def _extract_from_entries(self, entries) -> List[dict]:
+        tweets = []
+        for entry in entries:
+            if type(entry) is dict:
+                tweets.extend(self._extract_from_entry(entry))
+        return tweets
 
-    # _extract_from_entry, _extract_tweets_deep, etc. remain unchanged...
+    def _extract_from_new_instructions(self, payload: dict) -> List[dict]:
+        """
+        Extracts the tweet dicts from a raw GraphQL response page. Known operations are
+        resolved straight to their instructions list through _INSTRUCTION_PATHS; anything
+        else is searched for the first nested "instructions" list.
+        """
+        data = payload.get("data")
+        if type(data) is dict:
+            instructions = None
+            op = next((k for k in _INSTRUCTION_PATHS if k in data), None)
+            if op is not None:
+                node = data
+                for key in _INSTRUCTION_PATHS[op]:
+                    node = node.get(key) if type(node) is dict else None
+                instructions = node if type(node) is list else None
+            if instructions is None:
+                stack = [data]
+                while stack:
+                    node = stack.pop()
+                    if type(node) is not dict:
+                        continue
+                    found = node.get("instructions")
+                    if type(found) is list:
+                        instructions = found
+                        break
+                    stack.extend(node.values())
+        else:
+            instructions = payload.get("instructions")
+        if type(instructions) is not list:
+            return []
+
+        tweets = []
+        for instruction in instructions:
+            if type(instruction) is not dict:
+                continue
+            entries = instruction.get("entries")
+            if type(entries) is list:
+                tweets.extend(self._extract_from_entries(entries))
+            else:
+                single = instruction.get("entry")
+                if type(single) is dict:
+                    tweets.extend(self._extract_from_entry(single))
+        return tweets
 
 twitter_service = TwitterService()
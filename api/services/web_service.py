@@ -1,17 +1,19 @@
 import os
+import codecs
 import time
-import json
 import traceback
 import asyncio
 import random
 import re
+import zlib
+import hashlib
 from typing import List, Dict, Any, Tuple, Optional
 from urllib.parse import urlparse
 
 from fastapi.concurrency import run_in_threadpool
-import cloudscraper
-from bs4 import BeautifulSoup
-import httpx
+from selectolax.lexbor import LexborHTMLParser
+from cachetools import TTLCache
+import orjson
 
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
@@ -19,8 +21,29 @@ from sendgrid.helpers.mail import Mail
 from ..config import config
 from ..utils import logger
 from .rate_limiter import RateLimiter
+from .http_client import get_http_client
 
 MAX_TEXT_LENGTH_TO_SUMMARIZE = int(os.getenv("MAX_TEXT_LENGTH_TO_SUMMARIZE", "5000"))
+# Upper bound on the fullText kept per page (returned, cached in Redis and scanned for readability).
+MAX_FULL_TEXT_LENGTH = int(os.getenv("MAX_FULL_TEXT_LENGTH", "20000"))
+# Concurrent Venice summarizations per scrape_urls call (Venice has its own rate budget).
+_VENICE_CONCURRENCY = 20
+# Seconds a Venice summary is reused for an identical (text, query) pair.
+_SUMMARY_CACHE_TTL = 3600
+
+# Patterns applied to every Venice reply, compiled once at import.
+_THINK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+_FENCE_OPEN_RE = re.compile(r'^```(?:json)?\s*')
+_FENCE_CLOSE_RE = re.compile(r'\s*```$')
+
+def _strip_think(s: str) -> str:
+    """
+    Removes <think>...</think> reasoning blocks emitted by the model.
+    Most replies carry none, so a plain substring test skips the regex for them.
+    """
+    if "<think>" not in s:
+        return s
+    return _THINK_RE.sub('', s)
 
 # List of common user-agent strings for web scraping requests.
 USER_AGENTS = [
@@ -29,27 +52,132 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36"
 ]
 
+def _encode_cached(value: Dict[str, Any]) -> bytes:
+    """
+    Serializes a scrape result for Redis: orjson, then zlib. Page text compresses
+    several-fold, which cuts both Redis memory and transfer per entry.
+    """
+    return zlib.compress(orjson.dumps(value), 3)
+
+def _decode_cached(blob: bytes) -> Dict[str, Any]:
+    """
+    Inverse of _encode_cached. Entries written before compression was introduced
+    are plain JSON objects and are still accepted.
+    """
+    if blob[:1] == b"{":
+        return orjson.loads(blob)
+    return orjson.loads(zlib.decompress(blob))
+
+# <meta charset="..."> / <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+def _detect_encoding(body: bytes) -> Optional[str]:
+    """
+    Encoding of a page served without a charset in its Content-Type: the <meta> charset
+    near the top of the page when it has a usable one, otherwise charset_normalizer's
+    guess (what requests' apparent_encoding uses).
+    """
+    match = _META_CHARSET_RE.search(body, 0, 2048)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    import charset_normalizer
+    best = charset_normalizer.from_bytes(body).best()
+    return best.encoding if best else None
+
+# Encodings whose raw bytes can be handed to the parser as-is (Lexbor parses bytes as
+# UTF-8), by their codecs name.
+_UTF8_COMPATIBLE = frozenset(("utf-8", "ascii"))
+
+def _is_utf8_compatible(encoding: Optional[str]) -> bool:
+    if not encoding:
+        return False
+    try:
+        return codecs.lookup(encoding).name in _UTF8_COMPATIBLE
+    except LookupError:
+        return False
+
+def _page_markup(response):
+    """
+    Returns the body in the cheapest form the parser can take: the raw bytes when the
+    page's declared (or, failing that, detected; see _fetch_page) charset is UTF-8,
+    skipping a decode to str, otherwise the text decoded with that charset.
+    """
+    return response.content if _is_utf8_compatible(response.encoding) else response.text
+
+_ANTI_BOT_MARKERS = ("access denied", "captcha", "bot check")
+_ANTI_BOT_MARKERS_BYTES = tuple(m.encode("ascii") for m in _ANTI_BOT_MARKERS)
+
+# Browser-like headers sent with every page fetch (httpx and cloudscraper).
+_BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com/"
+}
+
+# Status codes that usually mean a Cloudflare/anti-bot challenge rather than a real error.
+_CHALLENGE_STATUS_CODES = (403, 503)
+
 class WebService:
     """
     Service layer for scraping content from given URLs.
-    Uses cloudscraper to bypass Cloudflare anti-bot challenges
-    and BeautifulSoup for HTML parsing.
+    Fetches pages over the shared httpx client, falling back to cloudscraper
+    to bypass Cloudflare anti-bot challenges, and uses selectolax (Lexbor) for HTML parsing.
     Includes a rate limiter to prevent excessive calls.
     """
     def __init__(self):
-        self.rate_limiter = RateLimiter(5, 60_000)
-        # This session will handle CF challenge flows automatically and maintain cookies between requests.
-        self.scraper = cloudscraper.create_scraper()
-        self.scraper.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Referer": "https://www.google.com/",
-            "Connection": "keep-alive"
-        })
+        self.rate_limiter = RateLimiter(5, 60_000, name="web_scrape")
+        # The cloudscraper session is created lazily on the first scrape (see _get_scraper).
+        self.scraper = None
         # Add a dedicated rate limiter for Venice API calls (20 per minute per user)
-        self.venice_rate_limiter = RateLimiter(20, 60_000)
+        self.venice_rate_limiter = RateLimiter(20, 60_000, name="venice")
+        # Per-process summary cache in front of the shared Redis one (see summarize_text)
+        self._summary_cache = TTLCache(maxsize=512, ttl=_SUMMARY_CACHE_TTL)
+
+    def _get_scraper(self):
+        """
+        Returns the cloudscraper session, importing and creating it on first use.
+        This session will handle CF challenge flows automatically and maintain cookies between requests.
+        """
+        if self.scraper is None:
+            import cloudscraper
+            self.scraper = cloudscraper.create_scraper()
+            self.scraper.headers.update(_BROWSER_HEADERS)
+            self.scraper.headers.update({
+                "Accept-Encoding": "gzip, deflate, br",
+                "Connection": "keep-alive"
+            })
+        return self.scraper
+
+    async def _fetch_page(self, url: str):
+        """
+        Fetches a page over the shared httpx client (pooled HTTP/2 connections).
+        Only when that is blocked (403/503) or fails does it retry through cloudscraper,
+        which solves Cloudflare challenges but costs a thread and a fresh connection.
+        """
+        import httpx
+        try:
+            response = await get_http_client().get(url, headers=_BROWSER_HEADERS, follow_redirects=True, timeout=10.0)
+            if response.status_code not in _CHALLENGE_STATUS_CODES:
+                # httpx assumes UTF-8 when no charset is declared; detect it instead,
+                # the same as for the cloudscraper fallback below.
+                if response.charset_encoding is None:
+                    response.encoding = _detect_encoding(response.content)
+                return response
+            logger.debug("Direct fetch blocked, retrying with cloudscraper", extra={"url": url, "status_code": response.status_code})
+        except httpx.HTTPError as e:
+            logger.debug("Direct fetch failed, retrying with cloudscraper", extra={"url": url, "error": str(e)})
+
+        scraper = self._get_scraper()
+        response = await run_in_threadpool(lambda: scraper.get(url, timeout=10))
+        # requests assumes ISO-8859-1 when no charset is declared; only then pay for
+        # the charset detection.
+        if "charset" not in response.headers.get("Content-Type", "").lower():
+            response.encoding = _detect_encoding(response.content)
+        return response
 
     def _is_valid_url(self, url: str) -> bool:
         """
@@ -91,48 +219,36 @@ class WebService:
             "IsQueryRelated": False,
             "relatedURLs": []
         }
-        
-        # Check for cached result
-        if self.rate_limiter.redis_client:
-            try:
-                cached = await self.rate_limiter.safe_execute('get', f"scrape:{url}")
-            except Exception as e:
-                if config.enable_debug:
-                    logger.exception("Redis error in caching get")
-                else:
-                    logger.error("Redis error in caching get", extra={"error": str(e)})
-                cached = None
-            if cached:
-                logger.debug("Returning cached scrape result", extra={"url": url})
-                return json.loads(cached)
-                
+
         try:
             logger.debug("Starting scraping URL", extra={"url": url})
             # Introduce a random delay to mimic human behavior (jitter)
             await asyncio.sleep(random.uniform(0.5, 1.5))
             start_time = time.time()
-            response = await run_in_threadpool(lambda: self.scraper.get(url, timeout=10))
-            # Force correct encoding based on apparent encoding
-            response.encoding = response.apparent_encoding
+            response = await self._fetch_page(url)
             duration = time.time() - start_time
             logger.debug("Finished scraping URL", extra={"url": url, "duration": duration, "status_code": response.status_code})
             single_result["status"] = response.status_code
             if response.status_code == 200:
-                if not response.text or response.text.strip() == "":
+                markup = _page_markup(response)
+                if not markup or not markup.strip():
                     logger.error("Empty response text received, possibly due to anti-bot block or network issue", extra={"url": url})
                     single_result["error"] = "Empty response text received"
                 else:
                     # Parse HTML content
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    title_tag = soup.find("title")
-                    meta_desc_tag = soup.find("meta", attrs={"name": "description"})
-                    full_text = soup.get_text(separator=" ", strip=True)
+                    tree = LexborHTMLParser(markup)
+                    title_tag = tree.css_first("title")
+                    meta_desc_tag = tree.css_first('meta[name="description"]')
+                    # Script and style bodies are not page text
+                    tree.strip_tags(["script", "style"])
+                    text_root = tree.body or tree.root
+                    full_text = text_root.text(separator=" ", strip=True)[:MAX_FULL_TEXT_LENGTH] if text_root else ""
                     
                     # Check for common anti-bot markers only if title is missing or appears invalid
-                    anti_bot_markers = ["access denied", "captcha", "bot check"]
-                    lower_text = response.text.lower()
+                    anti_bot_markers = _ANTI_BOT_MARKERS_BYTES if isinstance(markup, bytes) else _ANTI_BOT_MARKERS
+                    lower_text = markup.lower()
                     if any(marker in lower_text for marker in anti_bot_markers):
-                        if not title_tag or len(title_tag.get_text(strip=True)) < 5:
+                        if not title_tag or len(title_tag.text(strip=True)) < 5:
                             logger.error("Response indicates possible anti-bot protection", extra={"url": url, "response_snippet": response.text[:500]})
                             single_result["error"] = "Anti-bot protection triggered"
                         else:
@@ -143,9 +259,10 @@ class WebService:
                     if not title_tag:
                         logger.warning("No title found in HTML, unexpected HTML structure", extra={"url": url, "html_snippet": response.text[:300]})
                         logger.debug("Full HTML content for debugging", extra={"url": url, "html": response.text})
-                    single_result["title"] = title_tag.get_text(strip=True) if title_tag else ""
-                    if meta_desc_tag and meta_desc_tag.get("content"):
-                        single_result["metaDescription"] = meta_desc_tag["content"].strip()
+                    single_result["title"] = title_tag.text(strip=True) if title_tag else ""
+                    meta_desc = meta_desc_tag.attributes.get("content") if meta_desc_tag else None
+                    if meta_desc:
+                        single_result["metaDescription"] = meta_desc.strip()
                         
                     # Readability check
                     if full_text:
@@ -163,10 +280,6 @@ class WebService:
                             
                         single_result["textPreview"] = full_text[:200]
                         single_result["fullText"] = full_text
-                        summary, is_query_related, related_urls = await self.summarize_text(full_text, query)
-                        single_result["Summary"] = summary
-                        single_result["IsQueryRelated"] = is_query_related
-                        single_result["relatedURLs"] = related_urls
             else:
                 single_result["error"] = f"Non-200 status code: {response.status_code}"
                 logger.warning("Non-200 response while scraping URL", extra={
@@ -179,35 +292,93 @@ class WebService:
             tb = traceback.format_exc()
             logger.error("Error scraping URL", extra={"url": url, "error": str(exc), "traceback": tb})
             single_result["error"] = str(exc)
-            
-        # Cache the result if we have Redis configured
-        if self.rate_limiter.redis_client:
-            try:
-                await self.rate_limiter.safe_execute('set', f"scrape:{url}", json.dumps(single_result), ex=60)
-            except Exception as e:
-                if config.enable_debug:
-                    logger.exception("Redis error in caching set")
-                else:
-                    logger.error("Redis error in caching set", extra={"error": str(e)})
-                    
+
         return single_result
 
+    async def _cache_get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """
+        Reads all scrape cache entries in one MGET round-trip.
+        Returns one entry per key, None for misses or when Redis is unavailable.
+        """
+        if not keys or not self.rate_limiter.redis_client:
+            return [None] * len(keys)
+        try:
+            return await self.rate_limiter.safe_execute('mget', keys)
+        except Exception as e:
+            if config.enable_debug:
+                logger.exception("Redis error in caching get")
+            else:
+                logger.error("Redis error in caching get", extra={"error": str(e)})
+            return [None] * len(keys)
+
+    async def _cache_set_many(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Writes scrape cache entries (60s TTL) in a single pipelined round-trip.
+        """
+        if not items or not self.rate_limiter.redis_client:
+            return
+        try:
+            async with self.rate_limiter.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in items:
+                    pipe.set(key, _encode_cached(value), ex=60)
+                await pipe.execute()
+        except Exception as e:
+            if config.enable_debug:
+                logger.exception("Redis error in caching set")
+            else:
+                logger.error("Redis error in caching set", extra={"error": str(e)})
+
     async def scrape_urls(self, urls: List[str], query: str) -> List[Dict[str, Any]]:
         logger.debug("WebService: scrape_urls called", extra={"urls": urls, "query": query})
         await self.rate_limiter.check()
         
         # Filter out invalid URLs to avoid calling the scrape logic on nonsense values.
         urls = [url for url in urls if self._is_valid_url(url)]
+        # Scrape each distinct URL once; duplicates get the same result back in their original positions.
+        requested = urls
+        urls = list(dict.fromkeys(urls))
+
+        # Check for cached results for the whole batch at once
+        keys = [f"scrape:{url}" for url in urls]
+        cached_blobs = await self._cache_get_many(keys)
+        results: List[Optional[Dict[str, Any]]] = [
+            _decode_cached(blob) if blob else None for blob in cached_blobs
+        ]
+        misses = [i for i, blob in enumerate(cached_blobs) if not blob]
+        if len(misses) < len(urls):
+            logger.debug("Returning cached scrape results", extra={"cached": len(urls) - len(misses)})
         
-        # Use a semaphore to limit concurrent requests
+        # Use a semaphore to limit concurrent requests. Summarization has its own
+        # semaphore, so a page waiting on Venice does not hold a fetch slot.
         sem = asyncio.Semaphore(10)
+        venice_sem = asyncio.Semaphore(_VENICE_CONCURRENCY)
         
         async def sem_scrape(url):
             async with sem:
-                return await self._scrape_single_url(url, query)
+                single_result = await self._scrape_single_url(url, query)
+            if single_result and single_result["fullText"]:
+                try:
+                    async with venice_sem:
+                        summary, is_query_related, related_urls = await self.summarize_text(single_result["fullText"], query)
+                    single_result["Summary"] = summary
+                    single_result["IsQueryRelated"] = is_query_related
+                    single_result["relatedURLs"] = related_urls
+                except Exception as exc:
+                    logger.error("Error summarizing scraped URL", extra={"url": url, "error": str(exc)})
+                    single_result["error"] = str(exc)
+            return single_result
                 
-        results = await asyncio.gather(*(sem_scrape(url) for url in urls))
+        fresh = await asyncio.gather(*(sem_scrape(urls[i]) for i in misses))
+        for i, result in zip(misses, fresh):
+            results[i] = result
+
+        # Cache the new results if we have Redis configured
+        await self._cache_set_many([(keys[i], result) for i, result in zip(misses, fresh) if result is not None])
         
+        if len(urls) < len(requested):
+            by_url = dict(zip(urls, results))
+            results = [by_url[url] for url in requested]
+
         # Filter out entries that are None (i.e., unreadable content)
         results = [r for r in results if r is not None]
         
@@ -228,6 +399,51 @@ class WebService:
         if len(text) > max_text_length:
             text = text[:max_text_length]
 
+        # Identical bodies (syndicated articles, AMP vs canonical) for the same query
+        # reuse an earlier summary instead of calling Venice again.
+        digest = hashlib.blake2s(
+            f"{config.venice_model}\0{query}\0{text}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        cached = self._summary_cache.get(digest)
+        if cached is not None:
+            logger.debug("Returning in-process cached summary", extra={"digest": digest})
+            return cached
+        redis_key = f"summary:{digest}"
+        if self.venice_rate_limiter.redis_client:
+            try:
+                blob = await self.venice_rate_limiter.safe_execute('get', redis_key)
+            except Exception as e:
+                if config.enable_debug:
+                    logger.exception("Redis error in summary caching get")
+                else:
+                    logger.error("Redis error in summary caching get", extra={"error": str(e)})
+                blob = None
+            if blob:
+                summary, is_query_related, related_urls = orjson.loads(blob)
+                result = (summary, is_query_related, related_urls)
+                self._summary_cache[digest] = result
+                logger.debug("Returning cached summary", extra={"digest": digest})
+                return result
+
+        result = await self._summarize_uncached(text, query)
+
+        # Only successful summaries are cached, so failures are retried next time
+        if result[0]:
+            self._summary_cache[digest] = result
+            if self.venice_rate_limiter.redis_client:
+                try:
+                    await self.venice_rate_limiter.safe_execute('set', redis_key, orjson.dumps(result), ex=_SUMMARY_CACHE_TTL)
+                except Exception as e:
+                    if config.enable_debug:
+                        logger.exception("Redis error in summary caching set")
+                    else:
+                        logger.error("Redis error in summary caching set", extra={"error": str(e)})
+        return result
+
+    async def _summarize_uncached(self, text: str, query: str) -> Tuple[str, bool, List[str]]:
+        """
+        Performs the actual Venice call for summarize_text (text is already truncated).
+        """
         # Respect Venice rate limits
         await self.venice_rate_limiter.check()
 
@@ -261,12 +477,14 @@ class WebService:
             "Authorization": f"Bearer {config.venice_api_key}",
             "Content-Type": "application/json"
         }
+        import httpx
+
         max_attempts = 4
         delay = 1
         for attempt in range(max_attempts):
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(config.venice_url, json=payload, headers=headers, timeout=30.0)
+                client = get_http_client()
+                response = await client.post(config.venice_url, content=orjson.dumps(payload), headers=headers, timeout=30.0)
                 # If Venice returns 503 or 400, log details and retry if appropriate.
                 if response.status_code == 503:
                     reset_time = response.headers.get("x-ratelimit-reset-requests")
@@ -283,19 +501,19 @@ class WebService:
                     # Do not retry on 400 since it likely indicates a payload issue.
                     break
                 response.raise_for_status()
-                data = response.json()
+                data = orjson.loads(response.content)
                 summary = ""
                 is_query_related = False
                 related_urls = []
                 if "choices" in data and isinstance(data["choices"], list) and len(data["choices"]) > 0:
                     raw_content = data["choices"][0].get("message", {}).get("content", "")
-                    raw_content = re.sub(r'<think>.*?</think>', '', raw_content, flags=re.DOTALL).strip()
+                    raw_content = _strip_think(raw_content).strip()
                     # Remove markdown code block delimiters if present
                     if raw_content.startswith("```"):
-                        raw_content = re.sub(r'^```(?:json)?\s*', '', raw_content)
-                        raw_content = re.sub(r'\s*```$', '', raw_content)
+                        raw_content = _FENCE_OPEN_RE.sub('', raw_content)
+                        raw_content = _FENCE_CLOSE_RE.sub('', raw_content)
                     try:
-                        result_obj = json.loads(raw_content)
+                        result_obj = orjson.loads(raw_content)
                         summary = result_obj.get("summary", "")
                         is_query_related = result_obj.get("isQueryRelated", False)
                         related_urls = result_obj.get("relatedURLs", [])
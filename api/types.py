@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 class Tweet(BaseModel):
@@ -33,3 +33,30 @@ class EmailPayload(BaseModel):
     to_email: str
     subject: str
     html_content: str
+
+class CandidateLocation(BaseModel):
+    country: Optional[str] = None
+    region: Optional[str] = None
+    city: Optional[str] = None
+    remote: bool = False
+
+class CandidateEducation(BaseModel):
+    degree: Optional[str] = None
+    field_of_study: Optional[str] = None
+    school: Optional[str] = None
+
+class CandidateSearchPayload(BaseModel):
+    """
+    Request body for the LinkedIn candidate search endpoints.
+    """
+    job_title: str
+    skills: List[str] = []
+    location: Optional[CandidateLocation] = None
+    education: Optional[CandidateEducation] = None
+    experience_years_min: Optional[int] = None
+    industry: Optional[str] = None
+    company_size: Optional[str] = None
+    limit: int = 10
+    excluded_companies: List[str] = []
+    excluded_profiles: List[str] = []
+    cache_control: Optional[str] = None